@@ -0,0 +1,186 @@
+# File: instrumentation.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Site-wide request instrumentation. A middleware records,
+# for every request, the resolved view name, SQL query count, duplicate
+# queries, database time and template render time; records go to the
+# 'cs412.instrumentation' logger and to an in-memory ring buffer that
+# staff can read. Views can be given query budgets in settings, which the
+# test runner below enforces.
+
+import json
+import logging
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import JsonResponse
+from django.test.runner import DiscoverRunner
+
+logger = logging.getLogger('cs412.instrumentation')
+
+# Most recent request records, newest last
+recent_requests = deque(maxlen=getattr(settings, 'QUERY_INSTRUMENTATION_BUFFER', 200))
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a view runs more queries than its budget."""
+
+
+class QueryRecorder:
+    """A database execute wrapper that counts and times every query."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+            self.statements[(sql, repr(params))] += 1
+
+    def duplicates(self):
+        """Return how many queries repeated an earlier query exactly (same SQL and parameters)."""
+        return sum(n - 1 for n in self.statements.values())
+
+    def similar(self):
+        """Return how many queries repeated an earlier query's SQL with other parameters.
+
+        A high number usually means an N+1 pattern: one query per object
+        in a loop instead of a join or prefetch.
+        """
+        shapes = Counter(sql for sql, _ in self.statements.elements())
+        return sum(n - 1 for n in shapes.values()) - self.duplicates()
+
+
+def get_query_budget(view_name):
+    """Return the query budget declared for a view name in settings.QUERY_BUDGETS, or None."""
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+
+
+class QueryInstrumentationMiddleware:
+    """Record query count, duplicates, database time and render time per request.
+
+    Render time is measured for views returning a TemplateResponse (the
+    class-based views); views that call render() themselves render inside
+    the view, so for them it is None. Streaming responses (the CSV export)
+    run most of their queries while the body is sent, so their record is
+    written once the body has been consumed and is marked 'streamed'.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        request._instrumentation_render = None
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        if response.streaming and not response.is_async:
+            content = response.streaming_content
+            response.streaming_content = self.record_streamed(content, request, response, recorder, start)
+        else:
+            self.record(request, response, recorder, start)
+        return response
+
+    def record_streamed(self, content, request, response, recorder, start):
+        """Yield the body of a streaming response, counting its queries, then record the request."""
+
+        chunks = iter(content)
+        try:
+            while True:
+                with connection.execute_wrapper(recorder):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            self.record(request, response, recorder, start, streamed=True)
+
+    def record(self, request, response, recorder, start, streamed=False):
+        """Log and keep the record of a finished request, then check its query budget."""
+
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'duplicates': recorder.duplicates(),
+            'similar': recorder.similar(),
+            'db_ms': round(recorder.seconds * 1000, 2),
+            'render_ms': request._instrumentation_render,
+            'total_ms': round((time.perf_counter() - start) * 1000, 2),
+            'streamed': streamed,
+        }
+        recent_requests.append(record)
+        logger.info(json.dumps(record))
+
+        self.check_budget(record)
+
+    def process_template_response(self, request, response):
+        """Time the rendering of a TemplateResponse, which happens right after this hook."""
+
+        start = time.perf_counter()
+
+        def rendered(response):
+            request._instrumentation_render = round((time.perf_counter() - start) * 1000, 2)
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def check_budget(self, record):
+        """Warn, or raise QueryBudgetExceeded in strict mode, if a view is over its query budget."""
+
+        budget = get_query_budget(record['view'])
+        if budget is None or record['queries'] <= budget:
+            return
+
+        message = (
+            f"View {record['view']} ran {record['queries']} queries "
+            f"(budget {budget}, {record['similar']} similar) for {record['path']}"
+        )
+        if getattr(settings, 'QUERY_BUDGETS_STRICT', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """Test runner that makes going over a query budget fail the test (QUERY_BUDGETS_STRICT)."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.budgets_strict = settings.QUERY_BUDGETS_STRICT
+        settings.QUERY_BUDGETS_STRICT = True
+
+    def teardown_test_environment(self, **kwargs):
+        settings.QUERY_BUDGETS_STRICT = self.budgets_strict
+        super().teardown_test_environment(**kwargs)
+
+
+@staff_member_required
+def recent_requests_view(request):
+    """Return the most recent request records as JSON, newest first.
+
+    ?view=<name> keeps only the requests to one view.
+    """
+
+    records = list(reversed(recent_requests))
+    if request.GET.get('view'):
+        records = [r for r in records if r['view'] == request.GET['view']]
+    return JsonResponse({'budgets': getattr(settings, 'QUERY_BUDGETS', {}), 'requests': records})
@@ -63,11 +63,15 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    # Outermost, so session and auth queries are counted too
+    "cs412.instrumentation.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # Lazy request.profile for mini_insta, cached per user
+    "mini_insta.middleware.CurrentProfileMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     'corsheaders.middleware.CorsMiddleware',
@@ -116,6 +120,68 @@ DATABASES = {
 }
 
 
+# Where voter_analytics reads chart data and counts from: 'cube' uses the
+# precomputed VoterAggregate table (cached per filter), 'sql' runs grouped
+# queries against the Voter table on every request, 'columnar' keeps the
+# voters in memory as NumPy arrays (requires numpy) and 'bitmap' answers
+# from a bitmap index over party, score, birth year and election flags.
+VOTER_ANALYTICS_BACKEND = 'cube'
+
+
+# mini_insta feeds (mini_insta/timelines.py): with MINI_INSTA_TIMELINES on,
+# new posts are fanned out to per-follower timelines when they are created
+# and the feed is read from them. Authors with more followers than
+# MINI_INSTA_FANOUT_MAX_FOLLOWERS are merged in at read time instead; a
+# new follow copies at most MINI_INSTA_TIMELINE_BACKFILL recent posts. Run
+# `manage.py rebuild_timelines` after turning timelines on.
+MINI_INSTA_TIMELINES = False
+MINI_INSTA_FANOUT_MAX_FOLLOWERS = 1000
+MINI_INSTA_TIMELINE_BACKFILL = 200
+
+
+# Request instrumentation (cs412/instrumentation.py): per-request query
+# count, duplicate queries, DB time and render time, logged to the
+# 'cs412.instrumentation' logger and kept in a ring buffer that staff can
+# read at /debug/requests/.
+QUERY_INSTRUMENTATION = True
+QUERY_INSTRUMENTATION_BUFFER = 200
+
+# Maximum number of queries per request, by URL name. Going over logs a
+# warning; in strict mode it raises. The test runner turns strict mode on,
+# so a regression fails the tests.
+QUERY_BUDGETS = {
+    'voters': 8,
+    'graphs': 4,
+    'voter_chart_data': 4,
+    'show_voter': 2,
+    'voter_search': 6,
+    'voter_rollups': 2,
+    'show_feed': 7,
+    'feed_data': 7,
+    'show_profile': 6,
+    'show_post': 7,
+}
+QUERY_BUDGETS_STRICT = False
+
+TEST_RUNNER = 'cs412.instrumentation.QueryBudgetTestRunner'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # Set QUERY_LOG_LEVEL=INFO to log a JSON record for every request
+        'cs412.instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('QUERY_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
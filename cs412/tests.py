@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from voter_analytics.models import Voter
+from voter_analytics.tests import create_sample_voters
+
+from .instrumentation import QueryBudgetExceeded, QueryRecorder, recent_requests
+
+
+class QueryInstrumentationTests(TestCase):
+    """The instrumentation middleware records requests and enforces query budgets."""
+
+    def test_request_is_recorded(self):
+        self.client.get(reverse('voters'))
+        record = recent_requests[-1]
+        self.assertEqual(record['view'], 'voters')
+        self.assertGreater(record['queries'], 0)
+        self.assertIsNotNone(record['render_ms'])
+
+    def test_recorder_counts_duplicate_and_similar_queries(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            list(Voter.objects.filter(pk=1))
+            list(Voter.objects.filter(pk=1))
+            list(Voter.objects.filter(pk=2))
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual(recorder.duplicates(), 1)
+        self.assertEqual(recorder.similar(), 1)
+
+    @override_settings(QUERY_BUDGETS={'voters': 0}, QUERY_BUDGETS_STRICT=True)
+    def test_budget_exceeded_fails_in_strict_mode(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('voters'))
+
+    def test_test_runner_enforces_budgets(self):
+        self.assertTrue(settings.QUERY_BUDGETS_STRICT)
+
+    def test_streamed_response_queries_are_counted(self):
+        create_sample_voters()
+        response = self.client.get(reverse('voter_export'))
+        b''.join(response.streaming_content)
+        record = recent_requests[-1]
+        self.assertEqual(record['view'], 'voter_export')
+        self.assertTrue(record['streamed'])
+        self.assertGreater(record['queries'], 0)
+
+    @override_settings(QUERY_BUDGETS={'voter_export': 0})
+    def test_streamed_response_budget_is_checked(self):
+        create_sample_voters()
+        response = self.client.get(reverse('voter_export'))
+        with self.assertRaises(QueryBudgetExceeded):
+            b''.join(response.streaming_content)
+
+    def test_recent_requests_are_staff_only(self):
+        self.assertEqual(self.client.get(reverse('recent_requests')).status_code, 302)
+
+        User.objects.create_user('admin', password='pw', is_staff=True)
+        self.client.login(username='admin', password='pw')
+        self.client.get(reverse('graphs'))
+        data = self.client.get(reverse('recent_requests'), {'view': 'graphs'}).json()
+        self.assertEqual(data['requests'][0]['view'], 'graphs')
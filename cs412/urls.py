@@ -3,9 +3,14 @@ from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
 
+from .instrumentation import recent_requests_view
+
 urlpatterns = [
     # Django admin interface
     path("admin/", admin.site.urls),
+
+    # Recent request instrumentation records (staff only)
+    path("debug/requests/", recent_requests_view, name="recent_requests"),
     
     # Application URL
     path("dadjokes/", include("dadjokes.urls")),
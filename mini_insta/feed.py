@@ -0,0 +1,91 @@
+# File: feed.py
+# Author: Daniel Arteaga (d4nyart@bu.edu), 10/18/2026
+# Description: Cursor pagination for the post feed. Pages are ordered by
+# (timestamp, id), newest first, and continue from an opaque cursor that
+# encodes the last post shown, so every page is a LIMIT query of the same
+# size however many posts the followed profiles have.
+
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from django.urls import reverse
+
+from .models import Post, with_photos_and_comments
+from .timelines import read_timeline, timelines_enabled
+
+# Posts per feed page
+FEED_PAGE_SIZE = 10
+
+# Most recent comments sent with each post
+FEED_COMMENTS = 3
+
+
+def encode_cursor(post):
+    """Return the opaque cursor that continues the feed after `post`."""
+    key = f'{post.timestamp.isoformat()}|{post.pk}'
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """Return the (timestamp, id) in a cursor, or None if it is missing or invalid."""
+    if not value:
+        return None
+    try:
+        key = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+        timestamp, pk = key.split('|')
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def get_feed_page(profile, cursor=None, page_size=FEED_PAGE_SIZE):
+    """Return (posts, next_cursor) for the feed page of `profile` after `cursor`.
+
+    cursor is a decoded (timestamp, id) pair or None for the first page.
+    One extra post is fetched to find out whether another page follows;
+    next_cursor is None on the last page. With timelines on, the page is
+    read from the profile's timeline and its posts are loaded afterwards.
+    """
+
+    if timelines_enabled():
+        pks = read_timeline(profile, cursor, page_size + 1)
+        posts = with_photos_and_comments(Post.objects.filter(pk__in=pks)).order_by('-timestamp', '-pk')
+        rows = list(posts)
+    else:
+        posts = profile.get_post_feed()
+        if cursor is not None:
+            timestamp, pk = cursor
+            posts = posts.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, pk__lt=pk))
+        rows = list(posts[:page_size + 1])
+
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def serialize_post(post):
+    """Return the JSON-ready dictionary for one feed post.
+
+    Uses the photos and comments prefetched by get_feed_page and
+    the post's counters, so serializing a page runs no queries.
+    """
+
+    return {
+        'id': post.pk,
+        'url': reverse('show_post', kwargs={'pk': post.pk}),
+        'timestamp': post.timestamp.isoformat(),
+        'caption': post.caption,
+        'author': {
+            'username': post.profile.username,
+            'url': reverse('show_profile', kwargs={'pk': post.profile.pk}),
+            'profile_image_url': post.profile.profile_image_url,
+        },
+        'photo_urls': [photo.get_image_url() for photo in post.get_all_photos()],
+        'like_count': post.get_num_likes(),
+        'comment_count': post.get_num_comments(),
+        'comments': [
+            {'username': comment.profile.username, 'text': comment.text}
+            for comment in post.get_recent_comments(FEED_COMMENTS)
+        ],
+    }
@@ -0,0 +1,17 @@
+# File: rebuild_timelines.py
+# Author: Daniel Arteaga (d4nyart@bu.edu), 10/18/2026
+# Description: Management command that rebuilds the materialized feed
+# timelines from the follow graph, to turn timelines on for existing data
+# or to repair them.
+
+from django.core.management.base import BaseCommand
+
+from mini_insta.timelines import rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the materialized post timelines of every profile from the follow graph.'
+
+    def handle(self, *args, **options):
+        entries = rebuild_timelines()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt timelines ({entries} entries)."))
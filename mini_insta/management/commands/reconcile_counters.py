@@ -0,0 +1,19 @@
+# File: reconcile_counters.py
+# Author: Daniel Arteaga (d4nyart@bu.edu), 10/18/2026
+# Description: Management command that recomputes the denormalized
+# profile and post counters from the underlying rows and fixes any that
+# drifted.
+
+from django.core.management.base import BaseCommand
+
+from mini_insta.signals import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the Profile and Post counters and fixes any that drifted.'
+
+    def handle(self, *args, **options):
+        fixed = reconcile_counters()
+        for counter, rows in fixed.items():
+            self.stdout.write(f"  {counter:<25} {rows:>6} fixed")
+        self.stdout.write(self.style.SUCCESS(f"Reconciled counters ({sum(fixed.values())} rows fixed)."))
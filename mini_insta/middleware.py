@@ -0,0 +1,75 @@
+# File: middleware.py
+# Author: Daniel Arteaga (d4nyart@bu.edu), 10/18/2026
+# Description: Resolves the logged-in user's Profile at most once per
+# request. The middleware attaches it lazily as request.profile; the
+# profile is also kept in the cache by user id, so most requests do not
+# query for it at all. Cache entries are invalidated when the profile is
+# saved or deleted and when its counters change (see signals.py). With the
+# default per-process cache, invalidation only reaches the process that
+# made the change: other workers (and changes made from a management
+# command) can show a stale profile for up to PROFILE_CACHE_TIMEOUT
+# seconds. Configure a shared CACHES backend to avoid that.
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+
+from .models import Profile
+
+# Seconds a cached profile is kept
+PROFILE_CACHE_TIMEOUT = 300
+
+# Cached for users without a profile, so they are not looked up every request
+NO_PROFILE = 'none'
+
+
+def profile_cache_key(user_id):
+    """Return the cache key of the profile of a user."""
+    return f'mini_insta:profile:{user_id}'
+
+
+def invalidate_cached_profile(user_id):
+    """Drop the cached profile of a user, now and again once the transaction commits.
+
+    The second delete stops a request that read the old row before the
+    commit from caching it again.
+    """
+    key = profile_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def get_user_profile(user):
+    """Return the Profile of a user (from the cache if possible), or None if there is none."""
+
+    if not user.is_authenticated:
+        return None
+
+    key = profile_cache_key(user.pk)
+    profile = cache.get(key)
+    if profile is None:
+        profile = Profile.objects.filter(user=user).order_by('pk').first() or NO_PROFILE
+        cache.set(key, profile, PROFILE_CACHE_TIMEOUT)
+    return None if profile == NO_PROFILE else profile
+
+
+def get_request_profile(request):
+    """Return the logged-in user's Profile, resolving it only once per request."""
+    if not hasattr(request, '_profile'):
+        request._profile = get_user_profile(request.user)
+    return request._profile
+
+
+class CurrentProfileMiddleware:
+    """Attach the logged-in user's Profile to every request as request.profile.
+
+    The profile is looked up only when something reads it. Must come after
+    AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.profile = SimpleLazyObject(lambda: get_request_profile(request))
+        return self.get_response(request)
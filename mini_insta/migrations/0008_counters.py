@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# (model holding the counter, counter field, counted model, foreign key to the holder)
+COUNTERS = [
+    ("Profile", "post_count", "Post", "profile"),
+    ("Profile", "follower_count", "Follow", "profile"),
+    ("Profile", "following_count", "Follow", "follower_profile"),
+    ("Post", "like_count", "Like", "post"),
+    ("Post", "comment_count", "Comment", "post"),
+]
+
+
+def backfill_counters(apps, schema_editor):
+    """Set every counter from the rows already in the database."""
+    for model_name, field, counted_name, foreign_key in COUNTERS:
+        model = apps.get_model("mini_insta", model_name)
+        counted = apps.get_model("mini_insta", counted_name)
+        total = Subquery(
+            counted.objects.filter(**{foreign_key: OuterRef("pk")})
+            .order_by()
+            .values(foreign_key)
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        model.objects.update(**{field: Coalesce(total, 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mini_insta", "0007_profile_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="like_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="follower_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="following_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="post_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
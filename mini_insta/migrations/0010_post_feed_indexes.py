@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mini_insta", "0009_timelineentry"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["profile", "-timestamp", "-id"], name="post_profile_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["-timestamp", "-id"], name="post_time_idx"),
+        ),
+    ]
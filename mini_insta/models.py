@@ -5,6 +5,8 @@
 # posts, and associated photos.
 
 from django.db import models
+from django.core.files.storage import default_storage
+from django.db.models import Exists, OuterRef, Prefetch, Subquery
 from django.urls import reverse
 from django.contrib.auth.models import User
 
@@ -29,6 +31,12 @@ class Profile(models.Model):
 
     join_date = models.DateTimeField(auto_now_add=True)
 
+    # Counters kept up to date by the signal handlers in signals.py
+    # (see the reconcile_counters command to repair drift)
+    post_count = models.PositiveIntegerField(default=0)
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         """Return string representation of the profile"""
         return f"{self.username}"
@@ -38,15 +46,16 @@ class Profile(models.Model):
         return reverse('show_profile', kwargs={'pk':self.pk})
     
     def get_all_posts(self):
-        """Return all posts associated with this profile"""
-        posts = Post.objects.filter(profile=self)
+        """Return all posts associated with this profile, annotated with their first photo"""
+        posts = with_first_photo(Post.objects.filter(profile=self))
         return posts
     
     def get_followers(self):
         """Return a list of Profile objects that follow this profile"""
 
-        # Find all Follow objects where this profile is being followed
-        follow_relationships = Follow.objects.filter(profile=self)
+        # Find all Follow objects where this profile is being followed,
+        # joining the follower profiles so they are loaded in the same query
+        follow_relationships = Follow.objects.filter(profile=self).select_related('follower_profile')
         
         follower_profiles = []
 
@@ -57,13 +66,14 @@ class Profile(models.Model):
     
     def get_num_followers(self):
         """Return the number of followers for this profile"""
-        return Follow.objects.filter(profile=self).count()
+        return self.follower_count
     
     def get_following(self):
         """Return a list of Profile objects that this profile follows"""
 
-        # Find all Follow objects where this profile is the follower
-        follow_relationships = Follow.objects.filter(follower_profile=self)
+        # Find all Follow objects where this profile is the follower,
+        # joining the followed profiles so they are loaded in the same query
+        follow_relationships = Follow.objects.filter(follower_profile=self).select_related('profile')
         
         following_profiles = []
 
@@ -74,24 +84,30 @@ class Profile(models.Model):
         return following_profiles
 
     def get_num_following(self):
-        return Follow.objects.filter(follower_profile=self).count()
+        """Return the number of profiles this profile follows"""
+        return self.following_count
     
     #Extra (not asked yet in assignements)
     def get_num_posts(self):
-        print(Post.objects.filter(profile=self).count())
-        return Post.objects.filter(profile=self).count()
+        """Return the number of posts of this profile"""
+        return self.post_count
     
     def get_post_feed(self):
+        """Return the posts of every profile this profile follows, newest first.
+
+        Built as one queryset over the follow graph: the author profile is
+        joined and photos and comments (with their authors) are prefetched,
+        so the feed takes the same few queries however many profiles are
+        followed. Followed authors are checked with EXISTS rather than IN,
+        so a page is read from the (timestamp, id) index in order and stops
+        once it is full instead of sorting every followed post. With
+        settings.MINI_INSTA_TIMELINES on, feed pages are read from the
+        materialized timeline instead (see feed.get_feed_page).
+        """
 
-        profiles_followed = self.get_following()
-
-        post_of_followed = []
-
-        for profile in profiles_followed:
-            posts =  Post.objects.filter(profile=profile)
-            post_of_followed.extend(posts)
-
-        return post_of_followed 
+        followed = Follow.objects.filter(follower_profile=self, profile=OuterRef('profile'))
+        posts = Post.objects.filter(Exists(followed))
+        return with_photos_and_comments(posts).order_by('-timestamp', '-pk')
     
     
 class Post(models.Model):
@@ -105,6 +121,18 @@ class Post(models.Model):
     
     caption = models.TextField(blank=True) 
 
+    # Counters kept up to date by the signal handlers in signals.py
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # Feeds are read newest first by (timestamp, id): across followed
+        # profiles (get_post_feed) and for one profile (timelines.py)
+        indexes = [
+            models.Index(fields=['profile', '-timestamp', '-id'], name='post_profile_time_idx'),
+            models.Index(fields=['-timestamp', '-id'], name='post_time_idx'),
+        ]
+
     def __str__(self):
         """Return string representation of the post"""
         return f"Post {self.pk}"
@@ -114,18 +142,44 @@ class Post(models.Model):
         return reverse('show_post', kwargs={'pk':self.pk})
     
     def get_all_photos(self):
-        """Return all Photo objects related to this post"""
-        photos = Photo.objects.filter(post=self)
+        """Return all Photo objects related to this post (prefetched ones if available)"""
+        photos = self.photo_set.all()
         return photos
     
     def get_first_photo(self):
         """Return the first Photo object related to this post, or None if it does not exist."""
-        photos = Photo.objects.filter(post=self)
-        return photos.first()
+        photos = self.get_all_photos()
+
+        # Photos prefetched by the feed are already loaded; don't query again
+        if 'photo_set' in getattr(self, '_prefetched_objects_cache', {}):
+            return next(iter(photos), None)
+        return photos.order_by('pk').first()
     
+    def get_first_photo_url(self):
+        """Return the image URL of the first photo of this post, or None if it has none.
+
+        Uses the first_photo_url/first_photo_file annotations added by
+        with_first_photo() when present, so a list of posts needs no query
+        per post.
+        """
+        if hasattr(self, 'first_photo_url'):
+            if self.first_photo_url:
+                return self.first_photo_url
+            if self.first_photo_file:
+                return default_storage.url(self.first_photo_file)
+            return None
+
+        photo = self.get_first_photo()
+        return photo.get_image_url() if photo else None
+
     def get_all_comments(self):
-        comments = Comment.objects.filter(post=self)
+        """Return all Comment objects on this post (prefetched ones if available)"""
+        comments = self.comments.all()
         return comments
+
+    def get_recent_comments(self, count=3):
+        """Return the `count` most recent comments, oldest first (uses prefetched comments if available)"""
+        return list(self.get_all_comments())[-count:]
     
     def get_likes(self):
         likes = Like.objects.filter(post=self)
@@ -134,7 +188,27 @@ class Post(models.Model):
 
     #Extra
     def get_num_likes(self):
-        return Like.objects.filter(post=self).count()
+        """Return the number of likes on this post"""
+        return self.like_count
+
+    def get_num_comments(self):
+        """Return the number of comments on this post"""
+        return self.comment_count
+
+def with_first_photo(posts):
+    """Annotate a Post queryset with the image URL and file of each post's first photo."""
+    first_photo = Photo.objects.filter(post=OuterRef('pk')).order_by('pk')
+    return posts.annotate(
+        first_photo_url=Subquery(first_photo.values('image_url')[:1]),
+        first_photo_file=Subquery(first_photo.values('image_file')[:1]),
+    )
+
+def with_photos_and_comments(posts):
+    """Join the author of each post in a Post queryset and prefetch its photos and comments (with their authors)."""
+    return posts.select_related('profile').prefetch_related(
+        Prefetch('photo_set', queryset=Photo.objects.order_by('pk')),
+        Prefetch('comments', queryset=Comment.objects.select_related('profile').order_by('pk')),
+    )
 
 class Photo(models.Model):
     """Represent a Photo attached to a post
@@ -223,4 +297,32 @@ class Like(models.Model):
 
     def __str__(self):
         """Return string representation of the like"""
-        return f"Like {self.pk} by @{self.profile} on {self.post}"
\ No newline at end of file
+        return f"Like {self.pk} by @{self.profile} on {self.post}"
+
+class TimelineEntry(models.Model):
+    """Represent a post materialized in a follower's timeline.
+
+    Written when a post is fanned out to its author's followers, so a feed
+    can be read with one range scan over (owner, timestamp).
+    """
+
+    # Foreign key to the profile whose timeline holds the post
+    owner = models.ForeignKey(Profile, related_name="timeline", on_delete=models.CASCADE)
+
+    # Foreign key to the post in the timeline
+    post = models.ForeignKey(Post, related_name="timeline_entries", on_delete=models.CASCADE)
+
+    # Copy of the post's timestamp, so the timeline is ordered by its own index
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'post'], name='timelineentry_owner_post_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-timestamp', '-post'], name='timelineentry_owner_time_idx'),
+        ]
+
+    def __str__(self):
+        """Return string representation of the timeline entry"""
+        return f"{self.post} in the timeline of @{self.owner}"
@@ -0,0 +1,125 @@
+# File: signals.py
+# Author: Daniel Arteaga (d4nyart@bu.edu), 10/18/2026
+# Description: Keeps the denormalized counters on Profile and Post
+# (post_count, follower_count, following_count, like_count,
+# comment_count) up to date as Post, Follow, Like and Comment rows are
+# created and deleted, and recomputes them when they drift. Also backfills
+# and prunes materialized timelines on follow and unfollow, and drops
+# cached profiles when they change.
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .middleware import invalidate_cached_profile
+from .models import Comment, Follow, Like, Post, Profile
+from .timelines import backfill_timeline, prune_timeline, timelines_enabled
+
+# Every counter: (model holding it, counter field, counted model, foreign key to the holder)
+COUNTERS = [
+    (Profile, 'post_count', Post, 'profile'),
+    (Profile, 'follower_count', Follow, 'profile'),
+    (Profile, 'following_count', Follow, 'follower_profile'),
+    (Post, 'like_count', Like, 'post'),
+    (Post, 'comment_count', Comment, 'post'),
+]
+
+
+def update_counters(instance, delta):
+    """Add delta to every counter that counts rows like instance.
+
+    Each counter is changed with a single UPDATE ... SET n = n + delta, so
+    concurrent requests cannot lose increments. Decrements stop at zero.
+    """
+
+    for model, field, counted, foreign_key in COUNTERS:
+        if not isinstance(instance, counted):
+            continue
+        value = F(field) + delta if delta > 0 else Greatest(F(field) + delta, Value(0))
+        rows = model.objects.filter(pk=getattr(instance, f'{foreign_key}_id'))
+        rows.update(**{field: value})
+
+        # Cached profiles would show the old count
+        if model is Profile:
+            for user_id in rows.values_list('user_id', flat=True):
+                invalidate_cached_profile(user_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Follow)
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Comment)
+def increment_counters(sender, instance, created, raw=False, **kwargs):
+    """Count a newly created row (fixture loads are left to reconcile_counters)."""
+    if created and not raw:
+        update_counters(instance, 1)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Follow)
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Comment)
+def decrement_counters(sender, instance, **kwargs):
+    """Uncount a deleted row, including rows removed by a cascade."""
+    update_counters(instance, -1)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile(sender, instance, **kwargs):
+    """Drop the cached copy of a profile that was saved or deleted."""
+    invalidate_cached_profile(instance.user_id)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_followed_posts(sender, instance, created, raw=False, **kwargs):
+    """Add the newly followed profile's recent posts to the follower's timeline."""
+    if created and not raw and timelines_enabled():
+        backfill_timeline(instance.follower_profile_id, instance.profile_id)
+
+
+@receiver(post_delete, sender=Follow)
+def prune_unfollowed_posts(sender, instance, **kwargs):
+    """Remove the unfollowed profile's posts from the follower's timeline."""
+    if timelines_enabled():
+        prune_timeline(instance.follower_profile_id, instance.profile_id)
+
+
+def counted_subquery(counted, foreign_key):
+    """Return an expression counting the rows of `counted` pointing at the outer row."""
+    return Coalesce(
+        Subquery(
+            counted.objects.filter(**{foreign_key: OuterRef('pk')})
+            .order_by()
+            .values(foreign_key)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def reconcile_counters():
+    """Recompute every counter from the counted rows and fix the ones that drifted.
+
+    Counters go out of step when rows are changed without signals (bulk
+    operations, raw SQL, fixture loads). Returns {'Model.field': rows fixed}.
+    """
+
+    fixed = {}
+    for model, field, counted, foreign_key in COUNTERS:
+        drifted = (
+            model.objects.annotate(actual=counted_subquery(counted, foreign_key))
+            .exclude(**{field: F('actual')})
+            .values_list('pk', 'actual')
+        )
+        rows = 0
+        for pk, actual in drifted:
+            row = model.objects.filter(pk=pk)
+            rows += row.update(**{field: actual})
+            if model is Profile:
+                for user_id in row.values_list('user_id', flat=True):
+                    invalidate_cached_profile(user_id)
+        fixed[f'{model.__name__}.{field}'] = rows
+    return fixed
@@ -1,3 +1,367 @@
-from django.test import TestCase
+from datetime import datetime
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Comment, Follow, Like, Photo, Post, Profile, TimelineEntry
+from .forms import UpdatePostForm, UpdateProfileForm
+from .feed import FEED_PAGE_SIZE, decode_cursor, get_feed_page
+from .middleware import get_user_profile
+from .signals import reconcile_counters
+from .timelines import read_timeline, rebuild_timelines
 
 # Create your tests here.
+
+def create_profile(username):
+    """Create a User and its Profile."""
+    user = User.objects.create(username=username)
+    return Profile.objects.create(user=user, username=username)
+
+
+class PostFeedTests(TestCase):
+    """The post feed is one ordered queryset with a constant number of queries."""
+
+    def setUp(self):
+        self.reader = create_profile('reader')
+
+    def follow_profiles_with_posts(self, count):
+        """Make the reader follow `count` new profiles, each with a liked, commented post with a photo."""
+        for i in range(count):
+            author = create_profile(f'author{Profile.objects.count()}')
+            Follow.objects.create(profile=author, follower_profile=self.reader)
+            post = Post.objects.create(profile=author, caption=f'post {i}')
+            Photo.objects.create(post=post, image_url='https://example.com/photo.jpg')
+            Comment.objects.create(post=post, profile=self.reader, text='nice')
+            Like.objects.create(post=post, profile=self.reader)
+
+    def feed_query_count(self):
+        """Return the number of queries needed to load and render the feed."""
+        self.client.force_login(self.reader.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('show_feed'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_feed_is_newest_first(self):
+        self.follow_profiles_with_posts(3)
+        create_profile('stranger')
+        Post.objects.create(profile=Profile.objects.get(username='stranger'))
+
+        feed = list(self.reader.get_post_feed())
+        self.assertEqual(len(feed), 3)
+        self.assertEqual([p.pk for p in feed], sorted((p.pk for p in feed), reverse=True))
+        self.assertEqual(feed[0].get_num_likes(), 1)
+
+    def test_feed_query_count_does_not_grow_with_follows(self):
+        self.follow_profiles_with_posts(2)
+        few = self.feed_query_count()
+        self.follow_profiles_with_posts(20)
+        self.assertEqual(self.feed_query_count(), few)
+
+
+class CounterTests(TestCase):
+    """Profile and Post counters follow the rows they count."""
+
+    def setUp(self):
+        self.alice = create_profile('alice')
+        self.bob = create_profile('bob')
+
+    def test_counters_follow_creates_and_deletes(self):
+        post = Post.objects.create(profile=self.alice)
+        follow = Follow.objects.create(profile=self.alice, follower_profile=self.bob)
+        like = Like.objects.create(post=post, profile=self.bob)
+        Comment.objects.create(post=post, profile=self.bob, text='hi')
+
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual((self.alice.get_num_posts(), self.alice.get_num_followers()), (1, 1))
+        self.assertEqual(self.bob.get_num_following(), 1)
+        self.assertEqual((post.get_num_likes(), post.get_num_comments()), (1, 1))
+
+        follow.delete()
+        like.delete()
+        self.alice.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual((self.alice.follower_count, post.like_count), (0, 0))
+
+        # Deleting a profile uncounts its follows on other profiles
+        Follow.objects.create(profile=self.alice, follower_profile=self.bob)
+        self.bob.delete()
+        self.alice.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual((self.alice.follower_count, post.comment_count), (0, 0))
+
+    def test_edits_keep_counts_made_during_the_request(self):
+        post = Post.objects.create(profile=self.alice)
+        self.client.force_login(self.alice.user)
+
+        def like_meanwhile(form):
+            Like.objects.create(post=post, profile=self.bob)
+            return form.cleaned_data
+
+        with patch.object(UpdatePostForm, 'clean', autospec=True, side_effect=like_meanwhile):
+            self.client.post(reverse('update_post', kwargs={'pk': post.pk}), {'caption': 'edited'})
+        post.refresh_from_db()
+        self.assertEqual((post.caption, post.like_count), ('edited', 1))
+
+        def follow_meanwhile(form):
+            Follow.objects.create(profile=self.alice, follower_profile=self.bob)
+            return form.cleaned_data
+
+        with patch.object(UpdateProfileForm, 'clean', autospec=True, side_effect=follow_meanwhile):
+            self.client.post(reverse('update_profile'), {
+                'display_name': 'Alice', 'profile_image_url': '', 'bio_text': '',
+            })
+        self.alice.refresh_from_db()
+        self.assertEqual((self.alice.display_name, self.alice.follower_count), ('Alice', 1))
+
+    def test_reconcile_fixes_drift(self):
+        post = Post.objects.create(profile=self.alice)
+        Like.objects.create(post=post, profile=self.bob)
+        Profile.objects.filter(pk=self.alice.pk).update(post_count=7)
+        Post.objects.filter(pk=post.pk).update(like_count=0)
+        self.assertEqual(get_user_profile(self.alice.user).post_count, 7)
+
+        fixed = reconcile_counters()
+        # The cached profile is dropped along with the fixed counter
+        self.assertEqual(get_user_profile(self.alice.user).post_count, 1)
+        self.assertEqual((fixed['Profile.post_count'], fixed['Post.like_count']), (1, 1))
+        self.alice.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual((self.alice.post_count, post.like_count), (1, 1))
+        self.assertEqual(sum(reconcile_counters().values()), 0)
+
+    def test_profile_page_runs_no_count_queries(self):
+        Post.objects.create(profile=self.alice)
+        self.client.force_login(self.bob.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('show_profile', kwargs={'pk': self.alice.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql']])
+
+
+@override_settings(MINI_INSTA_TIMELINES=True, MINI_INSTA_FANOUT_MAX_FOLLOWERS=2)
+class TimelineTests(TestCase):
+    """Posts are fanned out to followers' timelines and read back as the feed."""
+
+    def setUp(self):
+        self.author = create_profile('author')
+        self.reader = create_profile('reader')
+        Follow.objects.create(profile=self.author, follower_profile=self.reader)
+
+    def create_post(self, profile, caption):
+        """Create a post through CreatePostView, running its on-commit fan-out."""
+        self.client.force_login(profile.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('create_post'), {'caption': caption})
+        return Post.objects.get(caption=caption)
+
+    def feed(self, profile):
+        """Return the posts of the first feed page of a profile."""
+        return get_feed_page(profile)[0]
+
+    def test_new_post_is_fanned_out_and_read_from_timeline(self):
+        post = self.create_post(self.author, 'hello')
+        self.assertTrue(TimelineEntry.objects.filter(owner=self.reader, post=post).exists())
+
+        # A post without a timeline entry is not in the feed
+        TimelineEntry.objects.all().delete()
+        self.assertEqual(list(self.feed(self.reader)), [])
+        rebuild_timelines()
+        self.assertEqual(list(self.feed(self.reader)), [post])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        post = self.create_post(self.author, 'hello')
+        other = create_profile('other')
+        Follow.objects.create(profile=self.author, follower_profile=other)
+        self.assertEqual(list(self.feed(other)), [post])
+
+        Follow.objects.filter(profile=self.author, follower_profile=other).delete()
+        self.assertFalse(TimelineEntry.objects.filter(owner=other).exists())
+        self.assertEqual(list(self.feed(other)), [])
+
+    def test_authors_over_the_limit_are_merged_at_read_time(self):
+        for name in ('fan1', 'fan2'):
+            Follow.objects.create(profile=self.author, follower_profile=create_profile(name))
+        post = self.create_post(self.author, 'popular')
+
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(list(self.feed(self.reader)), [post])
+
+    def test_pages_merge_timeline_and_read_time_posts(self):
+        popular = create_profile('popular')
+        Follow.objects.create(profile=popular, follower_profile=self.reader)
+        for name in ('fan1', 'fan2'):
+            Follow.objects.create(profile=popular, follower_profile=create_profile(name))
+        posts = [self.create_post(profile, f'post {i}')
+                 for i in range(12) for profile in [(self.author, popular)[i % 2]]]
+
+        seen, cursor = [], None
+        while True:
+            page, next_cursor = get_feed_page(self.reader, cursor, page_size=5)
+            seen += page
+            if next_cursor is None:
+                break
+            cursor = decode_cursor(next_cursor)
+        self.assertEqual(seen, posts[::-1])
+
+        # Within the feed's query budget (enforced by the test runner) once the profile is cached
+        self.client.force_login(self.reader.user)
+        get_user_profile(self.reader.user)
+        self.assertEqual(len(self.client.get(reverse('feed_data')).json()['posts']), FEED_PAGE_SIZE)
+
+    def test_timeline_page_is_read_in_index_order(self):
+        entries = TimelineEntry.objects.filter(owner=self.reader).order_by('-timestamp', '-post')
+        plan = entries.values_list('timestamp', 'post')[:11].explain()
+        self.assertIn('timelineentry_owner_time_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertEqual(read_timeline(self.reader, None, 11), [])
+
+
+class FeedPaginationTests(TestCase):
+    """The feed is served in fixed-size pages that continue from opaque cursors."""
+
+    def setUp(self):
+        self.reader = create_profile('reader')
+        self.author = create_profile('author')
+        Follow.objects.create(profile=self.author, follower_profile=self.reader)
+        self.client.force_login(self.reader.user)
+
+    def test_rendered_feed_shows_every_comment(self):
+        post = Post.objects.create(profile=self.author)
+        for i in range(5):
+            Comment.objects.create(post=post, profile=self.reader, text=f'comment {i}')
+
+        response = self.client.get(reverse('show_feed'))
+        for i in range(5):
+            self.assertContains(response, f'comment {i}')
+        # The feed API sends the latest ones only
+        comments = self.client.get(reverse('feed_data')).json()['posts'][0]['comments']
+        self.assertEqual([c['text'] for c in comments], ['comment 2', 'comment 3', 'comment 4'])
+
+    def test_feed_page_is_read_in_index_order(self):
+        posts = self.reader.get_post_feed()
+        for queryset in (posts, posts.filter(timestamp__lt=datetime(2026, 1, 1))):
+            plan = queryset[:FEED_PAGE_SIZE + 1].explain()
+            self.assertIn('post_time_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+        # The newest posts of one profile (timeline backfill and read-time merge)
+        plan = Post.objects.filter(profile=self.author).order_by('-timestamp', '-pk')[:FEED_PAGE_SIZE + 1].explain()
+        self.assertIn('post_profile_time_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_pages_cover_the_feed_once_in_order(self):
+        posts = [Post.objects.create(profile=self.author, caption=f'post {i}') for i in range(25)]
+        # Posts sharing a timestamp are ordered by id
+        Post.objects.filter(pk__in=[p.pk for p in posts[:5]]).update(timestamp=posts[0].timestamp)
+
+        seen, cursor = [], None
+        while True:
+            params = {'cursor': cursor} if cursor else {}
+            data = self.client.get(reverse('feed_data'), params).json()
+            self.assertLessEqual(len(data['posts']), FEED_PAGE_SIZE)
+            seen += [post['id'] for post in data['posts']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+
+        expected = Post.objects.order_by('-timestamp', '-pk').values_list('pk', flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_page_embeds_photos_and_counts(self):
+        post = Post.objects.create(profile=self.author, caption='hello')
+        Photo.objects.create(post=post, image_url='https://example.com/photo.jpg')
+        Like.objects.create(post=post, profile=self.reader)
+
+        data = self.client.get(reverse('feed_data')).json()
+        self.assertEqual(data['posts'][0]['photo_urls'], ['https://example.com/photo.jpg'])
+        self.assertEqual((data['posts'][0]['like_count'], data['next_cursor']), (1, None))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('feed_data'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_feed_page_renders_first_page_only(self):
+        for i in range(FEED_PAGE_SIZE + 1):
+            Post.objects.create(profile=self.author, caption=f'post {i}')
+        response = self.client.get(reverse('show_feed'))
+        self.assertEqual(len(response.context['post_feed']), FEED_PAGE_SIZE)
+        self.assertTrue(response.context['next_cursor'])
+
+
+class PageQueryCountTests(TestCase):
+    """Profile, post and feed pages run the same number of queries however many posts there are."""
+
+    def setUp(self):
+        self.reader = create_profile('reader')
+        self.author = create_profile('author')
+        Follow.objects.create(profile=self.author, follower_profile=self.reader)
+        self.client.force_login(self.reader.user)
+        # Put the reader's profile in the cache, so every page is measured warm
+        self.client.get(reverse('show_feed'))
+
+    def add_posts(self, count):
+        """Add `count` posts by the author, each with two photos, two comments and a like."""
+        for i in range(count):
+            post = Post.objects.create(profile=self.author, caption=f'post {i}')
+            for _ in range(2):
+                Photo.objects.create(post=post, image_url='https://example.com/photo.jpg')
+                Comment.objects.create(post=post, profile=create_profile(f'commenter{Profile.objects.count()}'), text='nice')
+            Like.objects.create(post=post, profile=self.reader)
+        return post
+
+    def query_counts(self):
+        """Return {url name: queries} for rendering each page once."""
+        post = Post.objects.filter(profile=self.author).latest('pk')
+        pages = {
+            'show_profile': reverse('show_profile', kwargs={'pk': self.author.pk}),
+            'show_post': reverse('show_post', kwargs={'pk': post.pk}),
+            'show_feed': reverse('show_feed'),
+            'feed_data': reverse('feed_data'),
+        }
+        counts = {}
+        for name, url in pages.items():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            counts[name] = len(queries)
+        return counts
+
+    def test_query_counts_do_not_grow_with_posts(self):
+        self.add_posts(2)
+        few = self.query_counts()
+        self.add_posts(20)
+        self.assertEqual(self.query_counts(), few)
+
+
+class CurrentProfileTests(TestCase):
+    """The logged-in profile is cached and dropped from the cache when it changes."""
+
+    def setUp(self):
+        self.profile = create_profile('alice')
+        self.user = self.profile.user
+
+    def test_profile_is_cached_until_it_changes(self):
+        self.assertEqual(get_user_profile(self.user), self.profile)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_profile(self.user), self.profile)
+
+        self.profile.display_name = 'Alice'
+        self.profile.save()
+        self.assertEqual(get_user_profile(self.user).display_name, 'Alice')
+
+        # Counter updates drop the cached copy too
+        Post.objects.create(profile=self.profile)
+        self.assertEqual(get_user_profile(self.user).post_count, 1)
+
+    def test_request_profile_in_navigation(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('show_feed'))
+        self.assertEqual(response.wsgi_request.profile, self.profile)
+        self.assertContains(response, reverse('show_profile', kwargs={'pk': self.profile.pk}))
@@ -0,0 +1,131 @@
+# File: timelines.py
+# Author: Daniel Arteaga (d4nyart@bu.edu), 10/18/2026
+# Description: Fan-out-on-write timelines for the post feed. When a post
+# is created it is copied into the TimelineEntry table of every follower
+# of its author; following and unfollowing backfill and prune entries.
+# Authors with more than MINI_INSTA_FANOUT_MAX_FOLLOWERS followers are not
+# fanned out: their posts are merged in when the feed is read (see
+# read_timeline). Enabled by settings.MINI_INSTA_TIMELINES.
+
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Follow, Post, Profile, TimelineEntry
+
+# Timeline entries inserted per INSERT statement
+FANOUT_BATCH_SIZE = 1000
+
+
+def timelines_enabled():
+    """Return True if feeds are read from materialized timelines."""
+    return getattr(settings, 'MINI_INSTA_TIMELINES', False)
+
+
+def fans_out(profile_id):
+    """Return True if the posts of a profile are written to its followers' timelines.
+
+    Profiles with more followers than MINI_INSTA_FANOUT_MAX_FOLLOWERS are
+    merged in at read time instead, so one post does not write a row per
+    follower. A profile that drops back under the limit keeps the posts it
+    made above it out of timelines until rebuild_timelines is run.
+    """
+    max_followers = getattr(settings, 'MINI_INSTA_FANOUT_MAX_FOLLOWERS', 1000)
+    return Profile.objects.filter(pk=profile_id, follower_count__lte=max_followers).exists()
+
+
+def read_timeline(profile, cursor, limit):
+    """Return the pks of the next `limit` posts of a profile's feed after `cursor`.
+
+    cursor is a decoded (timestamp, id) pair or None. Timeline entries are
+    read in the order of their (owner, -timestamp, -post) index, so the
+    page is a range scan that stops after `limit` rows. The newest posts of
+    followed profiles that are not fanned out are read by a second LIMIT
+    query and merged in. Posts are hydrated by the caller.
+    """
+
+    max_followers = getattr(settings, 'MINI_INSTA_FANOUT_MAX_FOLLOWERS', 1000)
+    entries = TimelineEntry.objects.filter(owner=profile)
+    merged = Post.objects.filter(profile__in=Follow.objects.filter(
+        follower_profile=profile, profile__follower_count__gt=max_followers).values('profile'))
+
+    if cursor is not None:
+        timestamp, pk = cursor
+        entries = entries.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, post__lt=pk))
+        merged = merged.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, pk__lt=pk))
+
+    keys = heapq.merge(
+        entries.order_by('-timestamp', '-post').values_list('timestamp', 'post')[:limit],
+        merged.order_by('-timestamp', '-pk').values_list('timestamp', 'pk')[:limit],
+        reverse=True,
+    )
+    # A post can be in both if its author went over the limit after it was fanned out
+    return list(dict.fromkeys(pk for _, pk in keys))[:limit]
+
+
+def insert_entries(entries):
+    """Insert TimelineEntry objects in batches, skipping ones that already exist."""
+    entries = iter(entries)
+    while batch := list(islice(entries, FANOUT_BATCH_SIZE)):
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def fan_out_post(post_id):
+    """Copy a post into the timeline of every follower of its author.
+
+    Meant to run after the post's transaction commits. Does nothing if the
+    post has been deleted since or its author is merged at read time.
+    """
+
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not fans_out(post.profile_id):
+        return
+
+    followers = Follow.objects.filter(profile_id=post.profile_id).values_list('follower_profile_id', flat=True)
+    insert_entries(
+        TimelineEntry(owner_id=follower_id, post_id=post.pk, timestamp=post.timestamp)
+        for follower_id in followers.iterator()
+    )
+
+
+def schedule_fan_out(post):
+    """Fan a new post out once the current transaction commits."""
+    transaction.on_commit(lambda: fan_out_post(post.pk))
+
+
+def backfill_timeline(follower_id, profile_id):
+    """Add the recent posts of a newly followed profile to the follower's timeline.
+
+    Only the MINI_INSTA_TIMELINE_BACKFILL most recent posts are copied.
+    """
+
+    if not fans_out(profile_id):
+        return
+
+    limit = getattr(settings, 'MINI_INSTA_TIMELINE_BACKFILL', 200)
+    posts = Post.objects.filter(profile_id=profile_id).order_by('-timestamp', '-pk').values_list('pk', 'timestamp')
+    insert_entries(
+        TimelineEntry(owner_id=follower_id, post_id=post_id, timestamp=timestamp)
+        for post_id, timestamp in posts[:limit]
+    )
+
+
+def prune_timeline(follower_id, profile_id):
+    """Remove the posts of an unfollowed profile from the follower's timeline."""
+    TimelineEntry.objects.filter(owner_id=follower_id, post__profile_id=profile_id).delete()
+
+
+def rebuild_timelines():
+    """Rebuild every timeline from the follow graph and return the number of entries.
+
+    Used to turn timelines on for existing data and to repair them.
+    """
+
+    with transaction.atomic():
+        TimelineEntry.objects.all().delete()
+        for follower_id, profile_id in Follow.objects.values_list('follower_profile_id', 'profile_id').iterator():
+            backfill_timeline(follower_id, profile_id)
+    return TimelineEntry.objects.count()
@@ -42,6 +42,9 @@ urlpatterns = [
     # Feed path for the logged-in user's profile
     path(r'profile/feed', PostFeedListView.as_view(), name="show_feed"),
 
+    # JSON pages of the logged-in user's feed, fetched by show_feed as the user scrolls
+    path(r'profile/feed/api', PostFeedDataView.as_view(), name="feed_data"),
+
     # Search path for the logged-in user
     path(r'profile/search', SearchView.as_view(), name="search"),
 
@@ -4,10 +4,15 @@
 # Contains ListView, DetailView, CreateView, UpdateView, and DeleteView for displaying user profiles,
 # posts, and handling post creation, updates, and deletion functionality.
 
+from django.http import JsonResponse
 from django.shortcuts import render
 from django.urls import reverse
+from django.views import View
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
-from .models import Profile, Post, Photo
+from .feed import decode_cursor, get_feed_page, serialize_post
+from .middleware import get_request_profile
+from .models import Profile, Post, Photo, with_photos_and_comments
+from .timelines import schedule_fan_out, timelines_enabled
 from .forms import *
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -24,12 +29,20 @@ class LoginRequiredMixinMiniInsta(LoginRequiredMixin):
 
     def get_logged_in_profile(self):
         """Return the Profile associated with the authenticated user, if any."""
-        if self.request.user.is_authenticated:
-            try:
-                return Profile.objects.get(user=self.request.user)
-            except Profile.DoesNotExist:
-                return None
-        return None
+        return get_request_profile(self.request)
+
+class SaveFormFieldsMixin:
+    """Save only the fields of the view's form (UpdateView).
+
+    A full save would also write back the counters loaded at the start of
+    the request, undoing likes, comments and follows counted meanwhile by
+    the F() updates in signals.py.
+    """
+
+    def form_valid(self, form):
+        self.object = form.save(commit=False)
+        self.object.save(update_fields=form._meta.fields)
+        return redirect(self.get_success_url())
 
 # Views
 class ProfileListView(ListView):
@@ -60,7 +73,7 @@ class ProfileDetailView(DetailView):
         
         # Check if user is authenticated
         if self.request.user.is_authenticated:
-            logged_in_profile = Profile.objects.get(user=self.request.user)
+            logged_in_profile = get_request_profile(self.request)
             profile_being_viewed = self.object        
             
             # Check if logged-in user follows this profile
@@ -82,13 +95,17 @@ class PostDetailView(DetailView):
     
     context_object_name = "post"
 
+    def get_queryset(self):
+        """Load the post with its author, photos and comments in a fixed number of queries"""
+        return with_photos_and_comments(Post.objects.all())
+
     def get_context_data(self, **kwargs):
         """Add follow status to context"""
         context = super().get_context_data(**kwargs)
         
         # Check if user is authenticated
         if self.request.user.is_authenticated:
-            logged_in_profile = Profile.objects.get(user=self.request.user)
+            logged_in_profile = get_request_profile(self.request)
             post_being_viewed = self.object        
             
             # Check if logged-in user follows this profile
@@ -146,9 +163,13 @@ class CreatePostView(LoginRequiredMixinMiniInsta, CreateView):
             for file in files:
                 Photo.objects.create(post=post, image_file=file)
 
+        # Push the post into the followers' timelines once it is committed
+        if timelines_enabled():
+            schedule_fan_out(post)
+
         return result
 
-class UpdateProfileView(LoginRequiredMixinMiniInsta, UpdateView):
+class UpdateProfileView(LoginRequiredMixinMiniInsta, SaveFormFieldsMixin, UpdateView):
     """Handle updating profile information for the logged-in user's profile"""
 
     model = Profile
@@ -158,7 +179,11 @@ class UpdateProfileView(LoginRequiredMixinMiniInsta, UpdateView):
     template_name = "mini_insta/update_profile_form.html"
 
     def get_object(self, queryset=None):
-        """Return the Profile object for the logged in user"""
+        """Return the Profile object for the logged in user.
+
+        Read fresh from the database rather than the cached request.profile,
+        which may be out of date.
+        """
         return Profile.objects.get(user=self.request.user)
 
 class DeletePostView(LoginRequiredMixinMiniInsta, DeleteView):
@@ -196,7 +221,7 @@ class DeletePostView(LoginRequiredMixinMiniInsta, DeleteView):
         profile_pk = self.object.profile.pk  
         return reverse('show_profile', kwargs={'pk': profile_pk})
     
-class UpdatePostView(LoginRequiredMixinMiniInsta, UpdateView):
+class UpdatePostView(LoginRequiredMixinMiniInsta, SaveFormFieldsMixin, UpdateView):
     """Handle updating caption text for an existing post.    """
 
     model = Post
@@ -236,12 +261,12 @@ class PostFeedListView(LoginRequiredMixinMiniInsta, DetailView):
     
     def get_object(self, queryset=None):
         """Return the Profile object for the logged in user"""
-        return Profile.objects.get(user=self.request.user)
+        return self.get_logged_in_profile()
     
     def get_context_data(self, **kwargs):
         """Add the post feed to the template context.
         
-        Uses the profile's get_post_feed() method to retrieve posts
+        Uses get_feed_page() to retrieve the first page of posts
         from all profiles that this profile follows
         """
         context = super().get_context_data(**kwargs)
@@ -249,12 +274,36 @@ class PostFeedListView(LoginRequiredMixinMiniInsta, DetailView):
         # Get the profile whose feed we're showing
         profile = self.object
         
-        # Get all posts from profiles that this profile follows
-        post_feed = profile.get_post_feed()
+        # Only the first page is rendered; the rest is fetched from
+        # PostFeedDataView as the user scrolls
+        post_feed, next_cursor = get_feed_page(profile)
                 
         context['post_feed'] = post_feed
+        context['next_cursor'] = next_cursor
         return context
 
+class PostFeedDataView(LoginRequiredMixinMiniInsta, View):
+    """Return one page of the logged-in user's post feed as JSON.
+
+    Pages are ordered newest first by (timestamp, id). ?cursor= takes the
+    next_cursor of the previous page; without it the first page is returned.
+    """
+
+    def get(self, request, *args, **kwargs):
+        cursor = decode_cursor(request.GET.get('cursor'))
+        if request.GET.get('cursor') and cursor is None:
+            return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+
+        profile = self.get_logged_in_profile()
+        if profile is None:
+            return JsonResponse({'error': 'No profile for this user.'}, status=404)
+
+        posts, next_cursor = get_feed_page(profile, cursor)
+        return JsonResponse({
+            'posts': [serialize_post(post) for post in posts],
+            'next_cursor': next_cursor,
+        })
+
 class SearchView(LoginRequiredMixinMiniInsta, ListView):
     """Search view to find profiles and posts based on text query
     
@@ -270,7 +319,7 @@ class SearchView(LoginRequiredMixinMiniInsta, ListView):
 
         if 'search_query' not in request.GET:
             # Get the profile of the logged-in user
-            profile = Profile.objects.get(user=request.user)
+            profile = self.get_logged_in_profile()
             return render(request, "mini_insta/search.html", {'profile': profile})
 
         return super().get(request, *args, **kwargs)
@@ -295,7 +344,7 @@ class SearchView(LoginRequiredMixinMiniInsta, ListView):
         context = super().get_context_data(**kwargs)
     
         # Add the profile of the logged-in user
-        profile = Profile.objects.get(user=self.request.user)
+        profile = self.get_logged_in_profile()
         context['profile'] = profile
     
         # Add the search query if present
@@ -0,0 +1,189 @@
+# File: aggregates.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Database-side aggregation for the voter analytics charts.
+# Computes party, birth year and election participation counts either
+# with grouped SQL queries over Voter or from the precomputed
+# VoterAggregate cube, whose filtered results are cached per filter.
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractYear
+
+from .models import ELECTION_FIELDS, Voter, VoterAggregate, VoterDataVersion
+
+# Seconds a per-filter result stays in the cache
+FILTER_CACHE_TIMEOUT = 60 * 60
+
+
+def voter_chart_counts(queryset):
+    """Return the chart counts for a filtered Voter queryset.
+
+    Runs three queries whatever the size of the queryset: one grouped by
+    party, one grouped by birth year and one conditional count over the
+    five election flags (which also yields the total voter count).
+
+    The result is a dictionary with the keys 'voter_count', 'parties'
+    (party -> count), 'birth_years' (year -> count) and 'elections'
+    (election field -> number of voters who voted).
+    """
+
+    parties = {
+        row['party']: row['count']
+        for row in queryset.order_by().values('party')
+                           .annotate(count=Count('pk')).order_by('party')
+    }
+
+    birth_years = {
+        row['birth_year']: row['count']
+        for row in queryset.order_by().annotate(birth_year=ExtractYear('date_birth'))
+                           .values('birth_year').annotate(count=Count('pk'))
+                           .order_by('birth_year')
+    }
+
+    totals = queryset.order_by().aggregate(
+        voter_count=Count('pk'),
+        **{name: Count('pk', filter=Q(**{name: True})) for name in ELECTION_FIELDS}
+    )
+
+    return {
+        'voter_count': totals['voter_count'],
+        'parties': parties,
+        'birth_years': birth_years,
+        'elections': {name: totals[name] for name in ELECTION_FIELDS},
+    }
+
+
+def get_data_version():
+    """Return the current voter data version (0 before the first load).
+
+    Read from the VoterDataVersion row rather than the cache: the default
+    cache is per process, so a version kept there would not reach the web
+    processes when a load runs from the command line.
+    """
+    return VoterDataVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+
+def bump_data_version():
+    """Give the voter data a new version and return it.
+
+    Written in the caller's transaction, so readers in every process see
+    the new version exactly when the rebuilt data commits. Versions are
+    timestamps, so they are never reused.
+    """
+    version = time.time_ns()
+    VoterDataVersion.objects.update_or_create(pk=1, defaults={'version': version})
+    return version
+
+
+def rebuild_voter_aggregates():
+    """Rebuild the VoterAggregate cube from the active voters.
+
+    Groups every active voter by party, voter score, birth year and the
+    five election flags, replaces the cube rows with the result and bumps
+    the cube version so previously cached results are ignored. Returns
+    the number of cube cells written.
+    """
+
+    cells = (
+        Voter.objects.filter(is_active=True)
+        .annotate(birth_year=ExtractYear('date_birth'))
+        .values('party', 'voter_score', 'birth_year', *ELECTION_FIELDS)
+        .annotate(voter_count=Count('pk'))
+        .order_by()
+    )
+
+    VoterAggregate.objects.all().delete()
+    created = VoterAggregate.objects.bulk_create(
+        [VoterAggregate(**cell) for cell in cells], batch_size=5000
+    )
+
+    bump_data_version()
+    return len(created)
+
+
+def cube_chart_counts(voter_filter):
+    """Return the chart counts for a VoterFilter, from the aggregate cube.
+
+    Same result shape as voter_chart_counts(). Results are cached per
+    filter combination and data version, so repeated requests for the same
+    filters are answered without touching the database.
+    """
+
+    key = voter_filter.cache_key('cube')
+    counts = cache.get(key)
+    if counts is not None:
+        return counts
+
+    cells = voter_filter.filter_aggregates(VoterAggregate.objects.all())
+
+    parties = {
+        row['party']: row['count']
+        for row in cells.values('party').annotate(count=Sum('voter_count')).order_by('party')
+    }
+
+    birth_years = {
+        row['birth_year']: row['count']
+        for row in cells.values('birth_year').annotate(count=Sum('voter_count')).order_by('birth_year')
+    }
+
+    totals = cells.aggregate(
+        total=Sum('voter_count'),
+        **{name: Sum('voter_count', filter=Q(**{name: True})) for name in ELECTION_FIELDS}
+    )
+
+    counts = {
+        'voter_count': totals['total'] or 0,
+        'parties': parties,
+        'birth_years': birth_years,
+        'elections': {name: totals[name] or 0 for name in ELECTION_FIELDS},
+    }
+    cache.set(key, counts, FILTER_CACHE_TIMEOUT)
+    return counts
+
+
+def get_chart_counts(voter_filter):
+    """Return the chart counts for a VoterFilter using the configured backend.
+
+    settings.VOTER_ANALYTICS_BACKEND selects where the counts come from:
+    'cube' (the default) answers from the cached aggregate cube, 'sql'
+    runs grouped queries against the filtered Voter table, 'columnar'
+    uses the in-memory NumPy columns (see columnar.py) and 'bitmap' the
+    bitmap index (see bitmaps.py).
+    """
+
+    backend = getattr(settings, 'VOTER_ANALYTICS_BACKEND', 'cube')
+
+    if backend == 'sql':
+        return voter_chart_counts(voter_filter.voters())
+    if backend == 'columnar':
+        from .columnar import columnar_chart_counts
+        return columnar_chart_counts(voter_filter)
+    if backend == 'bitmap':
+        from .bitmaps import bitmap_chart_counts
+        return bitmap_chart_counts(voter_filter)
+    return cube_chart_counts(voter_filter)
+
+
+def get_voter_count(voter_filter):
+    """Return the number of voters matching a VoterFilter using the configured backend.
+
+    With the 'sql' backend the COUNT query result is cached per filter, so
+    paging through a filtered list only counts it once per data version.
+    """
+
+    backend = getattr(settings, 'VOTER_ANALYTICS_BACKEND', 'cube')
+
+    if backend == 'sql':
+        return cache.get_or_set(
+            voter_filter.cache_key('count'), voter_filter.voters().count, FILTER_CACHE_TIMEOUT
+        )
+    if backend == 'columnar':
+        from .columnar import columnar_chart_counts
+        return columnar_chart_counts(voter_filter)['voter_count']
+    if backend == 'bitmap':
+        from .bitmaps import get_voter_bitmaps
+        return get_voter_bitmaps().mask(voter_filter).bit_count()
+    return cube_chart_counts(voter_filter)['voter_count']
@@ -0,0 +1,156 @@
+# File: benchmarks.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Benchmark harness for the voter analytics views. Generates
+# synthetic voter rolls in the CSV format the loader expects, defines the
+# scripted filter scenarios, and measures each view's latency, query
+# count and peak memory for every scenario.
+
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from .models import ELECTION_FIELDS
+from .views import VoterChartDataView, VoterListGraphsView, VoterListView
+
+# Column headers of the Newton voter file
+CSV_HEADER = [
+    'Voter ID Number', 'Last Name', 'First Name',
+    'Residential Address - Street Number', 'Residential Address - Street Name',
+    'Residential Address - Apartment Number', 'Residential Address - Zip Code',
+    'Date of Birth', 'Date of Registration', 'Party Affiliation', 'Precinct Number',
+    *ELECTION_FIELDS, 'voter_score',
+]
+
+# Value pools for synthetic voters, loosely shaped like the Newton roll
+NAME_STARTS = ['AB', 'BAR', 'CAL', 'DEL', 'FITZ', 'GAR', 'HAL', 'KEL', 'LEV', 'MAC',
+               'NOR', 'OB', 'PAT', 'ROS', 'SAL', 'SHAP', 'TOR', 'WAL', 'WIN', 'ZIM']
+NAME_ENDS = ['AMS', 'BERG', 'DON', 'ELLI', 'ER', 'GAN', 'IRO', 'KIN', 'LEY', 'MAN',
+             'NEY', 'OFF', 'RAN', 'SEN', 'SON', 'STEIN', 'TON', 'VEZ', 'WICZ', 'Y']
+FIRST_NAMES = ['ANA', 'DAVID', 'ELENA', 'JAMES', 'JOHN', 'LI', 'MARIA', 'MICHAEL', 'NOAH',
+               'OLIVIA', 'PRIYA', 'ROBERT', 'SARAH', 'SOFIA', 'THOMAS', 'WEI', 'YUSUF', 'ZOE']
+STREET_BASES = ['BEACON', 'CENTRE', 'CHESTNUT', 'COMMONWEALTH', 'DEDHAM', 'ELLIOT', 'FOREST',
+                'GROVE', 'HAMMOND', 'JACKSON', 'LAKE', 'LEXINGTON', 'LOWELL', 'PARK', 'PLEASANT',
+                'SUMMER', 'WALNUT', 'WARD', 'WASHINGTON', 'WAVERLEY']
+STREET_SUFFIXES = ['ST', 'AVE', 'RD', 'TER', 'PL']
+ZIP_CODES = ['02458', '02459', '02460', '02461', '02462', '02464', '02465', '02466', '02467', '02468']
+PARTIES = ['U', 'D', 'R', 'J', 'L', 'G', 'Q', 'CC']
+PARTY_WEIGHTS = [55, 30, 8, 2, 2, 1, 1, 1]
+PRECINCTS = [f'{ward}{letter}' for ward in range(1, 9) for letter in 'ABCD']
+
+# Share of voters who voted in each election, before individual propensity
+ELECTION_TURNOUT = {'v20state': 0.8, 'v21town': 0.3, 'v21primary': 0.2, 'v22general': 0.6, 'v23town': 0.3}
+
+# Scripted filter combinations: (name, GET parameters)
+SCENARIOS = [
+    ('all voters', {}),
+    ('party', {'party': 'D'}),
+    ('party + score', {'party': 'R', 'voter_score': '3'}),
+    ('birth range', {'min_birth_year': '1950', 'max_birth_year': '1970'}),
+    ('party + birth + election', {'party': 'U', 'min_birth_year': '1980', 'v20state': 'true'}),
+    ('elections only', {'v21town': 'true', 'v23town': 'true'}),
+    ('offset page 20', {'page': '20'}),
+]
+
+# Views measured for every scenario: (name, view class)
+VIEWS = [
+    ('voter list', VoterListView),
+    ('graphs page', VoterListGraphsView),
+    ('chart data', VoterChartDataView),
+]
+
+
+def generate_voter_rows(count, seed=0):
+    """Yield `count` synthetic rows of the voter CSV (without the header).
+
+    The same seed always produces the same roll. Each voter has a turnout
+    propensity, so participation is correlated across elections and
+    voter_score (the number of elections voted in) is realistic.
+    """
+
+    rng = random.Random(seed)
+    streets = [f'{base} {suffix}' for base in STREET_BASES for suffix in STREET_SUFFIXES]
+    reference = date(2024, 1, 1)
+
+    for number in range(count):
+        birth = reference - timedelta(days=rng.randint(18 * 365, 100 * 365))
+        registered = birth + timedelta(days=rng.randint(18 * 365, (reference - birth).days))
+        propensity = rng.betavariate(2, 2)
+        flags = [rng.random() < min(1.0, 2 * propensity * ELECTION_TURNOUT[name]) for name in ELECTION_FIELDS]
+
+        yield [
+            f'{number:08d}X',
+            rng.choice(NAME_STARTS) + rng.choice(NAME_ENDS),
+            rng.choice(FIRST_NAMES),
+            str(rng.randint(1, 400)),
+            rng.choice(streets),
+            str(rng.randint(1, 12)) if rng.random() < 0.25 else '',
+            rng.choice(ZIP_CODES),
+            birth.isoformat(),
+            registered.isoformat(),
+            f'{rng.choices(PARTIES, PARTY_WEIGHTS)[0]:<2}',
+            rng.choice(PRECINCTS),
+            *('TRUE' if flag else 'FALSE' for flag in flags),
+            str(sum(flags)),
+        ]
+
+
+def run_view(view_class, params):
+    """Run a view for GET parameters and return the rendered response."""
+    request = RequestFactory().get('/', params)
+    response = view_class.as_view()(request)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def measure(view_class, params, repeat=5):
+    """Measure one view for one scenario.
+
+    Returns a dictionary with the latency of a cold run (empty cache) and
+    the median of `repeat` warm runs in milliseconds, the query count of
+    each, and the peak Python memory of a warm run in KB.
+    """
+
+    cache.clear()
+    with CaptureQueriesContext(connection) as cold_queries:
+        start = time.perf_counter()
+        run_view(view_class, params)
+        cold_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as warm_queries:
+            start = time.perf_counter()
+            run_view(view_class, params)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    # Memory is measured on a separate run; tracemalloc slows execution down
+    gc.collect()
+    tracemalloc.start()
+    run_view(view_class, params)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'cold_ms': round(cold_ms, 2),
+        'warm_ms': round(statistics.median(timings), 2),
+        'cold_queries': len(cold_queries),
+        'warm_queries': len(warm_queries),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(repeat=5, scenarios=SCENARIOS, views=VIEWS):
+    """Yield one result dictionary per (view, scenario) pair."""
+    for view_name, view_class in views:
+        for scenario, params in scenarios:
+            yield {'view': view_name, 'scenario': scenario, 'params': params,
+                   **measure(view_class, params, repeat)}
@@ -0,0 +1,187 @@
+# File: bitmaps.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Bitmap index over the low-cardinality voter columns. Keeps
+# one bitmap per party, voter score, birth year and election flag, so
+# filter combinations become ANDs of bitmaps and counts become popcounts.
+# Selected with VOTER_ANALYTICS_BACKEND = 'bitmap'.
+
+import threading
+import zlib
+
+from django.core.cache import cache
+
+from .aggregates import get_data_version
+from .models import ELECTION_FIELDS, Voter
+
+# Rows fetched per database round trip while building the bitmaps
+BUILD_CHUNK_SIZE = 10000
+
+# Seconds the compressed bitmaps stay cached; a new data load replaces them sooner
+BITMAP_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class VoterBitmaps:
+    """Bitmaps over the active voters, as Python ints.
+
+    Voter number i (in primary key order) is bit i of every bitmap.
+    Bitmaps are keyed by (column, value): ('party', 'D'),
+    ('voter_score', 3), ('birth_year', 1960), and ('v20state', True) for
+    each election flag (the False side is the complement).
+    """
+
+    def __init__(self, version, size, bitmaps):
+        self.version = version
+        self.size = size
+        self.bitmaps = bitmaps
+        self.all = (1 << size) - 1
+
+    @classmethod
+    def build(cls, version):
+        """Build the bitmaps for the current active voters from the database."""
+
+        rows = (
+            Voter.objects.filter(is_active=True)
+            .values_list('party', 'voter_score', 'date_birth', *ELECTION_FIELDS)
+            .order_by('pk')
+            .iterator(chunk_size=BUILD_CHUNK_SIZE)
+        )
+
+        # Set bits in bytearrays first; OR-ing into big ints row by row is quadratic
+        arrays = {}
+        size = 0
+        for i, (party, voter_score, date_birth, *flags) in enumerate(rows):
+            byte, bit = i >> 3, 1 << (i & 7)
+            keys = [('party', party), ('voter_score', voter_score), ('birth_year', date_birth.year)]
+            keys += [(name, True) for name, value in zip(ELECTION_FIELDS, flags) if value]
+            for key in keys:
+                array = arrays.get(key)
+                if array is None:
+                    array = arrays[key] = bytearray()
+                if len(array) <= byte:
+                    array.extend(bytes(byte + 1 - len(array)))
+                array[byte] |= bit
+            size = i + 1
+
+        bitmaps = {key: int.from_bytes(array, 'little') for key, array in arrays.items()}
+        return cls(version, size, bitmaps)
+
+    def compress(self):
+        """Return the bitmaps as a picklable dictionary of zlib-compressed bytes."""
+        return {
+            'size': self.size,
+            'bitmaps': {
+                key: zlib.compress(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'))
+                for key, bitmap in self.bitmaps.items()
+            },
+        }
+
+    @classmethod
+    def decompress(cls, version, data):
+        """Return the VoterBitmaps stored by compress()."""
+        bitmaps = {
+            key: int.from_bytes(zlib.decompress(value), 'little')
+            for key, value in data['bitmaps'].items()
+        }
+        return cls(version, data['size'], bitmaps)
+
+    def values(self, column):
+        """Return the sorted values that have a bitmap for a column."""
+        return sorted(value for name, value in self.bitmaps if name == column)
+
+    def get(self, column, value):
+        """Return the bitmap of rows where column equals value."""
+        if column in ELECTION_FIELDS and not value:
+            return self.all & ~self.bitmaps.get((column, True), 0)
+        return self.bitmaps.get((column, value), 0)
+
+    def mask(self, voter_filter):
+        """Return the bitmap of rows selected by a VoterFilter."""
+
+        mask = self.all
+        if voter_filter.party is not None:
+            mask &= self.get('party', voter_filter.party)
+        if voter_filter.voter_score is not None:
+            mask &= self.get('voter_score', voter_filter.voter_score)
+        if voter_filter.min_birth_year is not None or voter_filter.max_birth_year is not None:
+            years = 0
+            for year in self.values('birth_year'):
+                if voter_filter.min_birth_year is not None and year < voter_filter.min_birth_year:
+                    continue
+                if voter_filter.max_birth_year is not None and year > voter_filter.max_birth_year:
+                    continue
+                years |= self.get('birth_year', year)
+            mask &= years
+        for name, value in voter_filter.elections.items():
+            mask &= self.get(name, value)
+        return mask
+
+    def chart_counts(self, voter_filter):
+        """Return the chart counts for a VoterFilter from popcounts.
+
+        Same result shape as aggregates.voter_chart_counts().
+        """
+
+        mask = self.mask(voter_filter)
+
+        def counts(column):
+            result = {}
+            for value in self.values(column):
+                count = (mask & self.get(column, value)).bit_count()
+                if count:
+                    result[value] = count
+            return result
+
+        return {
+            'voter_count': mask.bit_count(),
+            'parties': counts('party'),
+            'birth_years': counts('birth_year'),
+            'elections': {name: (mask & self.get(name, True)).bit_count() for name in ELECTION_FIELDS},
+        }
+
+
+_bitmaps = None
+_bitmaps_lock = threading.Lock()
+
+
+def load_voter_bitmaps(version):
+    """Return the VoterBitmaps for a data version from the cache, building them if needed.
+
+    The compressed bitmaps are stored in the default cache. With the
+    default per-process LocMemCache that only saves rebuilding them in the
+    same process; processes share them only if CACHES points at a shared
+    backend (file, database or Redis).
+    """
+
+    key = f'voter_analytics:bitmaps:{version}'
+    data = cache.get(key)
+    if data is not None:
+        return VoterBitmaps.decompress(version, data)
+
+    bitmaps = VoterBitmaps.build(version)
+    cache.set(key, bitmaps.compress(), BITMAP_CACHE_TIMEOUT)
+    return bitmaps
+
+
+def get_voter_bitmaps():
+    """Return the VoterBitmaps for the current voter data.
+
+    Each process keeps a decompressed copy until the data version, read
+    from the database on every call, changes; so a load run by another
+    process is picked up by the next request.
+    """
+
+    global _bitmaps
+
+    version = get_data_version()
+    bitmaps = _bitmaps
+    if bitmaps is None or bitmaps.version != version:
+        with _bitmaps_lock:
+            if _bitmaps is None or _bitmaps.version != version:
+                _bitmaps = load_voter_bitmaps(version)
+            bitmaps = _bitmaps
+    return bitmaps
+
+
+def bitmap_chart_counts(voter_filter):
+    """Return the chart counts for a VoterFilter from the bitmap index."""
+    return get_voter_bitmaps().chart_counts(voter_filter)
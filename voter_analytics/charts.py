@@ -0,0 +1,46 @@
+# File: charts.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Chart data for the voter analytics graphs page. Turns the
+# chart counts into compact label/value series for client-side Plotly
+# rendering, and loads the plotly.js bundle served by PlotlyJSView.
+
+from functools import lru_cache
+
+from django.core.cache import cache
+
+import plotly
+
+from .aggregates import FILTER_CACHE_TIMEOUT, get_chart_counts
+
+
+def series(counts):
+    """Return a {label: count} dictionary as parallel label and value lists."""
+    return {'labels': list(counts.keys()), 'values': list(counts.values())}
+
+
+def get_chart_data(voter_filter):
+    """Return the graphs page chart series for a VoterFilter, cached per filter.
+
+    The result is a small JSON-ready dictionary: the voter count plus a
+    label/value series for the birth year histogram, the party mix and
+    election participation.
+    """
+
+    key = voter_filter.cache_key('chart_data')
+    data = cache.get(key)
+    if data is None:
+        counts = get_chart_counts(voter_filter)
+        data = {
+            'voter_count': counts['voter_count'],
+            'birth_years': series(counts['birth_years']),
+            'parties': series(counts['parties']),
+            'elections': series(counts['elections']),
+        }
+        cache.set(key, data, FILTER_CACHE_TIMEOUT)
+    return data
+
+
+@lru_cache(maxsize=1)
+def get_plotlyjs():
+    """Return the plotly.js bundle shipped with the installed plotly package."""
+    return plotly.offline.get_plotlyjs()
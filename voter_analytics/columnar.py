@@ -0,0 +1,153 @@
+# File: columnar.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Optional in-memory columnar engine for the voter analytics
+# charts. Loads the active voters once into NumPy arrays (categorical
+# codes, integer years and scores, packed election flags) and answers
+# filters with vectorized masks and aggregations with bincounts.
+# Requires NumPy; selected with VOTER_ANALYTICS_BACKEND = 'columnar'.
+
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the 'columnar' backend
+    np = None
+
+from .aggregates import get_data_version
+from .models import ELECTION_FIELDS, Voter
+
+# Rows fetched per database round trip while loading the columns
+LOAD_CHUNK_SIZE = 10000
+
+
+class VoterColumns:
+    """The active voters as a set of NumPy columns.
+
+    Party and precinct are stored as small integer codes into sorted
+    label arrays, birth years and voter scores as narrow integer arrays,
+    and each election flag as a bit-packed boolean array.
+    """
+
+    def __init__(self, version):
+        self.version = version
+
+        rows = (
+            Voter.objects.filter(is_active=True)
+            .values_list('party', 'precinct_num', 'date_birth', 'voter_score', *ELECTION_FIELDS)
+            .order_by()
+            .iterator(chunk_size=LOAD_CHUNK_SIZE)
+        )
+        columns = list(zip(*rows)) or [()] * (4 + len(ELECTION_FIELDS))
+        parties, precincts, births, scores = columns[:4]
+
+        self.size = len(parties)
+        self.party_labels, self.party_codes = self.encode(parties)
+        self.precinct_labels, self.precinct_codes = self.encode(precincts)
+        self.birth_years = np.fromiter((d.year for d in births), dtype=np.int16, count=self.size)
+        self.voter_scores = np.array(scores, dtype=np.int8)
+        self.flags = {
+            name: np.packbits(np.array(values, dtype=bool))
+            for name, values in zip(ELECTION_FIELDS, columns[4:])
+        }
+
+    @staticmethod
+    def encode(values):
+        """Return (sorted labels, per-row codes) for a categorical column."""
+        labels, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+        return labels, codes.astype(np.uint16)
+
+    def flag(self, name):
+        """Return an election flag column as an unpacked boolean array."""
+        return np.unpackbits(self.flags[name], count=self.size).view(bool)
+
+    def mask(self, voter_filter):
+        """Return the boolean row mask selected by a VoterFilter."""
+
+        mask = np.ones(self.size, dtype=bool)
+        if voter_filter.party is not None:
+            code = np.searchsorted(self.party_labels, voter_filter.party)
+            if code == len(self.party_labels) or self.party_labels[code] != voter_filter.party:
+                return np.zeros(self.size, dtype=bool)
+            mask &= self.party_codes == code
+        if voter_filter.voter_score is not None:
+            mask &= self.voter_scores == voter_filter.voter_score
+        if voter_filter.min_birth_year is not None:
+            mask &= self.birth_years >= voter_filter.min_birth_year
+        if voter_filter.max_birth_year is not None:
+            mask &= self.birth_years <= voter_filter.max_birth_year
+        for name, value in voter_filter.elections.items():
+            mask &= self.flag(name) == value
+        return mask
+
+    def chart_counts(self, voter_filter):
+        """Return the chart counts for a VoterFilter.
+
+        Same result shape as aggregates.voter_chart_counts().
+        """
+
+        mask = self.mask(voter_filter)
+
+        party_counts = np.bincount(self.party_codes[mask], minlength=len(self.party_labels))
+        parties = {
+            str(label): int(count)
+            for label, count in zip(self.party_labels, party_counts) if count
+        }
+
+        years = self.birth_years[mask]
+        birth_years = {}
+        if years.size:
+            first = int(years.min())
+            year_counts = np.bincount(years - first)
+            birth_years = {
+                first + offset: int(count)
+                for offset, count in enumerate(year_counts) if count
+            }
+
+        # Participation: AND the packed mask with each packed flag and count the bits
+        packed_mask = np.packbits(mask)
+        elections = {
+            name: int(np.unpackbits(packed_mask & self.flags[name]).sum())
+            for name in ELECTION_FIELDS
+        }
+
+        return {
+            'voter_count': int(mask.sum()),
+            'parties': parties,
+            'birth_years': birth_years,
+            'elections': elections,
+        }
+
+
+_columns = None
+_columns_lock = threading.Lock()
+
+
+def get_voter_columns():
+    """Return the VoterColumns for the current voter data, loading them if needed.
+
+    The columns are kept per process and reloaded the first time they are
+    used after the data version changes. The version is read from the
+    database on every call, so a load run by another process (such as the
+    load_voters command) is picked up by the next request.
+    """
+
+    global _columns
+
+    if np is None:
+        raise ImproperlyConfigured("The 'columnar' voter analytics backend requires NumPy.")
+
+    version = get_data_version()
+    columns = _columns
+    if columns is None or columns.version != version:
+        with _columns_lock:
+            if _columns is None or _columns.version != version:
+                _columns = VoterColumns(version)
+            columns = _columns
+    return columns
+
+
+def columnar_chart_counts(voter_filter):
+    """Return the chart counts for a VoterFilter from the in-memory columns."""
+    return get_voter_columns().chart_counts(voter_filter)
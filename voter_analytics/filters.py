@@ -0,0 +1,133 @@
+# File: filters.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: The voter filter shared by every voter analytics view.
+# Parses the filter form's GET parameters once and builds the matching
+# Voter (or VoterAggregate) queryset and a normalized cache key for it.
+
+import hashlib
+from datetime import MAXYEAR, MINYEAR, date
+from urllib.parse import urlencode
+
+from django.utils.functional import cached_property
+
+from .aggregates import get_data_version
+from .models import ELECTION_FIELDS, Voter
+
+# GET parameters understood by the voter filter form
+FILTER_PARAMS = ['party', 'voter_score', 'min_birth_year', 'max_birth_year', *ELECTION_FIELDS]
+
+
+def parse_int(value):
+    """Return value as an int, or None if it is missing or not a number."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_year(value):
+    """Return value as a calendar year, or None if it is missing or out of range."""
+    year = parse_int(value)
+    if year is None or not MINYEAR <= year <= MAXYEAR:
+        return None
+    return year
+
+
+class VoterFilter:
+    """The state of the voter filter form.
+
+    Built from a mapping of GET parameters (usually request.GET). Unknown
+    parameters are ignored, as are values that do not parse, so two
+    requests that mean the same thing produce the same filter and the
+    same cache key.
+    """
+
+    def __init__(self, params):
+        self.party = (params.get('party') or '').strip() or None
+        self.voter_score = parse_int(params.get('voter_score'))
+        self.min_birth_year = parse_year(params.get('min_birth_year'))
+        self.max_birth_year = parse_year(params.get('max_birth_year'))
+
+        # Election flag -> required value; only flags present in the request
+        self.elections = {
+            name: params[name] == 'true'
+            for name in ELECTION_FIELDS if params.get(name)
+        }
+
+    def as_params(self):
+        """Return the normalized filter as a dict of GET parameter strings."""
+
+        params = {}
+        if self.party is not None:
+            params['party'] = self.party
+        if self.voter_score is not None:
+            params['voter_score'] = str(self.voter_score)
+        if self.min_birth_year is not None:
+            params['min_birth_year'] = str(self.min_birth_year)
+        if self.max_birth_year is not None:
+            params['max_birth_year'] = str(self.max_birth_year)
+        for name, value in self.elections.items():
+            params[name] = 'true' if value else 'false'
+        return params
+
+    def querystring(self):
+        """Return the normalized filter as a URL query string."""
+        return urlencode(sorted(self.as_params().items()))
+
+    def cache_key(self, prefix):
+        """Return a cache key for a result computed for this filter.
+
+        The key covers the normalized filter and the current voter data
+        version, so it changes whenever the voter data is reloaded.
+        """
+
+        digest = hashlib.md5(self.querystring().encode()).hexdigest()
+        return f"voter_analytics:{prefix}:{self.data_version}:{digest}"
+
+    @cached_property
+    def data_version(self):
+        """The voter data version, read once per filter (so once per request)."""
+        return get_data_version()
+
+    def selected_context(self):
+        """Return the selected_* template variables used to keep the form filled in."""
+        params = self.as_params()
+        return {f'selected_{name}': params.get(name, '') for name in FILTER_PARAMS}
+
+    def filter_voters(self, queryset):
+        """Apply the filter to a Voter queryset.
+
+        Party is matched exactly and birth years become date ranges, so
+        the filters can use the Voter indexes.
+        """
+
+        if self.party is not None:
+            queryset = queryset.filter(party=self.party)
+        if self.voter_score is not None:
+            queryset = queryset.filter(voter_score=self.voter_score)
+        if self.min_birth_year is not None:
+            queryset = queryset.filter(date_birth__gte=date(self.min_birth_year, 1, 1))
+        if self.max_birth_year is not None:
+            queryset = queryset.filter(date_birth__lte=date(self.max_birth_year, 12, 31))
+        if self.elections:
+            queryset = queryset.filter(**self.elections)
+        return queryset
+
+    def filter_aggregates(self, queryset):
+        """Apply the filter to a VoterAggregate (cube) queryset."""
+
+        if self.party is not None:
+            queryset = queryset.filter(party=self.party)
+        if self.voter_score is not None:
+            queryset = queryset.filter(voter_score=self.voter_score)
+        if self.min_birth_year is not None:
+            queryset = queryset.filter(birth_year__gte=self.min_birth_year)
+        if self.max_birth_year is not None:
+            queryset = queryset.filter(birth_year__lte=self.max_birth_year)
+        if self.elections:
+            queryset = queryset.filter(**self.elections)
+        return queryset
+
+    def voters(self):
+        """Return the active voters matching the filter, ordered by primary key."""
+        return self.filter_voters(Voter.objects.filter(is_active=True)).order_by('pk')
@@ -0,0 +1,350 @@
+# File: loading.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Streaming CSV ingestion for the voter analytics application.
+# Parses the Newton voter file with the csv module and writes Voter rows
+# in batches with executemany inside a single transaction. Also provides
+# an incremental sync that only writes new and changed voters. Derived
+# data (the aggregate cube) is rebuilt at the end of every load.
+
+import csv
+import hashlib
+import time
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import DateField
+
+from .aggregates import rebuild_voter_aggregates
+from .metadata import refresh_filter_options
+from .models import ELECTION_FIELDS, Voter
+from .rollups import rebuild_voter_rollups
+from .search import rebuild_voter_search
+
+# Number of Voter rows written per INSERT batch (executemany or bulk_create)
+DEFAULT_BATCH_SIZE = 5000
+
+# Hex characters of the row fingerprint stored in Voter.row_hash
+ROW_HASH_LENGTH = 16
+
+# Number of columns expected on every data row of the voter file
+NUM_COLUMNS = 17
+
+# Voter fields written by load_voters, in INSERT order (all but the pk)
+INSERT_FIELDS = [field for field in Voter._meta.concrete_fields if not field.primary_key]
+
+# Maximum lengths of the Voter text columns that have one
+MAX_LENGTHS = {field.attname: field.max_length for field in INSERT_FIELDS if field.max_length is not None}
+
+# Voter fields rewritten when a changed row is synced
+SYNC_UPDATE_FIELDS = [
+    'last_name', 'first_name', 'street_num', 'street_name', 'apt_num',
+    'zip_code', 'date_birth', 'date_registration', 'party', 'precinct_num',
+    *ELECTION_FIELDS, 'voter_score', 'row_hash', 'is_active',
+]
+
+
+class VoterTableNotEmpty(ValueError):
+    """Raised by load_voters() when the Voter table already has rows and clear is False."""
+
+
+class LoadStats:
+    """Summary of a voter file load: rows written, rows rejected and timing."""
+
+    def __init__(self):
+        self.loaded = 0
+        self.rejected = 0
+        self.rejected_rows = []
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        """Return the load throughput in rows per second."""
+        if self.seconds == 0:
+            return 0.0
+        return (self.loaded + self.rejected) / self.seconds
+
+
+class SyncStats(LoadStats):
+    """Summary of an incremental sync, broken down by what happened to each voter."""
+
+    def __init__(self):
+        super().__init__()
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.tombstoned = 0
+
+    @property
+    def rows_per_second(self):
+        """Return the sync throughput in rows read per second."""
+        if self.seconds == 0:
+            return 0.0
+        return (self.created + self.updated + self.unchanged + self.rejected) / self.seconds
+
+
+def hash_voter_row(fields):
+    """Return a stable fingerprint for one stripped row of the voter CSV.
+
+    The first 64 bits of the SHA-1, as 16 hex characters: the hash is only
+    compared with the same voter's previous row, so that is plenty and
+    keeps Voter rows small.
+    """
+    return hashlib.sha1('\x1f'.join(fields).encode('utf-8')).hexdigest()[:ROW_HASH_LENGTH]
+
+
+def normalize_zip_code(value):
+    """Return a zip code as five digits, or '' if it is blank or not a zip code.
+
+    ZIP+4 codes are cut to their first five digits and leading zeros lost
+    by spreadsheets are restored ("2459" -> "02459"). A bad zip code does
+    not reject the voter; it is stored as unknown ('').
+    """
+
+    digits = value.split('-')[0].strip()
+    if digits.isdigit() and len(digits) <= 5:
+        return digits.zfill(5)
+    if digits.isdigit() and len(digits) == 9:
+        return digits[:5]
+    return ''
+
+
+def check_field_lengths(values):
+    """Raise ValueError if a text value of a parsed voter is longer than its column."""
+    for name, max_length in MAX_LENGTHS.items():
+        if len(values[name]) > max_length:
+            raise ValueError(f"{name} is longer than {max_length} characters: {values[name]!r}")
+
+
+def parse_voter_values(fields):
+    """Return the Voter field values of one row of the voter CSV, as a dict.
+
+    Raises ValueError if the row has the wrong number of columns, any
+    date, boolean or integer field cannot be converted or a field does not
+    fit its column (e.g. a party longer than 3 characters).
+    """
+
+    if len(fields) != NUM_COLUMNS:
+        raise ValueError(f"expected {NUM_COLUMNS} columns, got {len(fields)}")
+
+    fields = [field.strip() for field in fields]
+
+    values = {
+        'row_hash': hash_voter_row(fields),
+        'voter_id': fields[0],
+        'last_name': fields[1],
+        'first_name': fields[2],
+        'street_num': fields[3],
+        'street_name': fields[4],
+        'apt_num': fields[5],
+        'zip_code': normalize_zip_code(fields[6]),
+        'date_birth': date.fromisoformat(fields[7]),
+        'date_registration': date.fromisoformat(fields[8]),
+        'party': fields[9],
+        'precinct_num': fields[10],
+        'voter_score': int(fields[16]),
+    }
+    for index, name in enumerate(ELECTION_FIELDS, start=11):
+        value = fields[index].upper()
+        if value not in ('TRUE', 'FALSE'):
+            raise ValueError(f"{name} is not TRUE/FALSE: {fields[index]!r}")
+        values[name] = value == 'TRUE'
+
+    check_field_lengths(values)
+    return values
+
+
+def parse_voter_row(fields):
+    """Build an unsaved Voter from one row of the voter CSV (see parse_voter_values)."""
+    return Voter(**parse_voter_values(fields))
+
+
+def insert_voters(batch):
+    """Insert parsed voters (dicts from parse_voter_values) with one executemany.
+
+    Skips building a Voter instance per row and the per-value work of
+    bulk_create, which took most of the time of a large load. Fields not
+    in the voter file get their model defaults.
+    """
+
+    quote = connection.ops.quote_name
+    columns = [
+        (field.attname, field.get_default(),
+         connection.ops.adapt_datefield_value if isinstance(field, DateField) else None)
+        for field in INSERT_FIELDS
+    ]
+    sql = (
+        f"INSERT INTO {quote(Voter._meta.db_table)} "
+        f"({', '.join(quote(field.column) for field in INSERT_FIELDS)}) "
+        f"VALUES ({', '.join(['%s'] * len(INSERT_FIELDS))})"
+    )
+    rows = [
+        tuple(
+            adapt(values[name]) if adapt else values.get(name, default)
+            for name, default, adapt in columns
+        )
+        for values in batch
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def refresh_derived_data():
+    """Rebuild every table and cache derived from the Voter table.
+
+    Called by the loaders after voters change; can also be run on its own
+    (see the rebuild_voter_aggregates command) after editing voters by hand.
+    """
+    rebuild_voter_aggregates()
+    rebuild_voter_rollups()
+    rebuild_voter_search()
+    refresh_filter_options()
+
+
+def read_voter_rows(filename):
+    """Yield (line_number, fields) for every data row of the voter CSV.
+
+    The header row is skipped. The file is read lazily, so memory use does
+    not grow with the size of the file.
+    """
+
+    with open(filename, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # discard headers
+        for fields in reader:
+            if not fields:
+                continue
+            yield reader.line_num, fields
+
+
+def load_voters(filename, batch_size=DEFAULT_BATCH_SIZE, clear=False):
+    """Stream the voter CSV into the database and return a LoadStats.
+
+    Rows are parsed one at a time and written with one executemany every
+    batch_size rows (see insert_voters). The whole load runs in one transaction, so readers
+    never see a partially loaded roll. If clear is True the existing
+    voters are deleted first, inside the same transaction; otherwise the
+    table must be empty (use sync_voters() to reload into a populated
+    table), since voter_id is unique. Rows that fail to parse or repeat a
+    voter_id are skipped and recorded on the returned stats. The derived
+    voter data is rebuilt before the transaction commits.
+    """
+
+    stats = LoadStats()
+    start = time.perf_counter()
+
+    with transaction.atomic():
+        if clear:
+            Voter.objects.all().delete()
+        elif Voter.objects.exists():
+            raise VoterTableNotEmpty("the Voter table is not empty; clear it first or sync instead")
+
+        batch = []
+        seen = set()
+        for line_num, fields in read_voter_rows(filename):
+            try:
+                values = parse_voter_values(fields)
+                if values['voter_id'] in seen:
+                    raise ValueError(f"duplicate voter_id {values['voter_id']!r}")
+            except ValueError as e:
+                stats.rejected += 1
+                stats.rejected_rows.append((line_num, fields, str(e)))
+                continue
+
+            seen.add(values['voter_id'])
+            batch.append(values)
+
+            if len(batch) >= batch_size:
+                insert_voters(batch)
+                stats.loaded += len(batch)
+                batch = []
+
+        if batch:
+            insert_voters(batch)
+            stats.loaded += len(batch)
+
+        refresh_derived_data()
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def sync_voters(filename, batch_size=DEFAULT_BATCH_SIZE, tombstone=False):
+    """Incrementally reload the voter CSV and return a SyncStats.
+
+    Each row is fingerprinted and compared with the row_hash stored on the
+    voter with the same voter_id. New voters are bulk-inserted, changed or
+    previously tombstoned voters are bulk-updated and identical rows are
+    left alone. If tombstone is True, active voters whose voter_id is not
+    in the file are marked inactive. Runs in one transaction, and rebuilds
+    the derived voter data before it commits.
+    """
+
+    stats = SyncStats()
+    start = time.perf_counter()
+
+    with transaction.atomic():
+        # voter_id -> (pk, row_hash, is_active) for every stored voter
+        existing = {
+            voter_id: (pk, row_hash, is_active)
+            for pk, voter_id, row_hash, is_active in Voter.objects.values_list(
+                'pk', 'voter_id', 'row_hash', 'is_active'
+            ).iterator(chunk_size=batch_size)
+        }
+        seen = set()
+        to_create = []
+        to_update = []
+
+        for line_num, fields in read_voter_rows(filename):
+            try:
+                voter = parse_voter_row(fields)
+                if voter.voter_id in seen:
+                    raise ValueError(f"duplicate voter_id {voter.voter_id!r}")
+            except ValueError as e:
+                stats.rejected += 1
+                stats.rejected_rows.append((line_num, fields, str(e)))
+                continue
+
+            seen.add(voter.voter_id)
+            current = existing.get(voter.voter_id)
+
+            if current is None:
+                to_create.append(voter)
+            elif current[1] != voter.row_hash or not current[2]:
+                voter.pk = current[0]
+                to_update.append(voter)
+            else:
+                stats.unchanged += 1
+
+            if len(to_create) >= batch_size:
+                Voter.objects.bulk_create(to_create, batch_size=batch_size)
+                stats.created += len(to_create)
+                to_create = []
+
+            if len(to_update) >= batch_size:
+                Voter.objects.bulk_update(to_update, SYNC_UPDATE_FIELDS, batch_size=batch_size)
+                stats.updated += len(to_update)
+                to_update = []
+
+        if to_create:
+            Voter.objects.bulk_create(to_create, batch_size=batch_size)
+            stats.created += len(to_create)
+
+        if to_update:
+            Voter.objects.bulk_update(to_update, SYNC_UPDATE_FIELDS, batch_size=batch_size)
+            stats.updated += len(to_update)
+
+        if tombstone:
+            missing = [
+                pk for voter_id, (pk, row_hash, is_active) in existing.items()
+                if is_active and voter_id not in seen
+            ]
+            for i in range(0, len(missing), batch_size):
+                stats.tombstoned += Voter.objects.filter(
+                    pk__in=missing[i:i + batch_size]
+                ).update(is_active=False)
+
+        refresh_derived_data()
+
+    stats.loaded = stats.created + stats.updated
+    stats.seconds = time.perf_counter() - start
+    return stats
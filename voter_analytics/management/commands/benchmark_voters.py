@@ -0,0 +1,76 @@
+# File: benchmark_voters.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Management command that runs the scripted filter scenarios
+# against the voter analytics views, records latency, query count and
+# peak memory to a JSON results file, and optionally compares the run
+# with a baseline results file.
+
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from voter_analytics.benchmarks import run_benchmarks
+from voter_analytics.models import Voter
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the voter analytics views over scripted filter combinations.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='voter_benchmark.json',
+            help='JSON file the results are written to (default voter_benchmark.json).',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Earlier results file to compare warm latencies against.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Warm runs per view and scenario; the median is recorded (default 5).',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+
+        baseline = {}
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as f:
+                    baseline = {(r['view'], r['scenario']): r for r in json.load(f)['results']}
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Cannot read baseline {options['baseline']}: {e}")
+
+        voters = Voter.objects.count()
+        self.stdout.write(f"Benchmarking {voters:,} voters ({connection.vendor}).")
+
+        results = []
+        for result in run_benchmarks(repeat=options['repeat']):
+            results.append(result)
+
+            line = (
+                f"  {result['view']:<12} {result['scenario']:<26} "
+                f"cold {result['cold_ms']:>8.1f} ms / {result['cold_queries']:>2} q   "
+                f"warm {result['warm_ms']:>8.1f} ms / {result['warm_queries']:>2} q   "
+                f"peak {result['peak_kb']:>8.0f} KB"
+            )
+            before = baseline.get((result['view'], result['scenario']))
+            if before and before['warm_ms']:
+                line += f"   x{result['warm_ms'] / before['warm_ms']:.2f} vs baseline"
+            self.stdout.write(line)
+
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'voters': voters,
+                'database': connection.vendor,
+                'backend': getattr(settings, 'VOTER_ANALYTICS_BACKEND', 'cube'),
+                'repeat': options['repeat'],
+                'results': results,
+            }, f, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}."))
@@ -0,0 +1,38 @@
+# File: generate_voters.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Management command that writes a synthetic voter roll in
+# the Newton voter CSV format, for benchmarking at sizes from 10k to 1M.
+
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from voter_analytics.benchmarks import CSV_HEADER, generate_voter_rows
+
+
+class Command(BaseCommand):
+    help = 'Writes a synthetic voter CSV that load_voters can load.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Path of the CSV file to write.')
+        parser.add_argument(
+            '--count', type=int, default=100000,
+            help='Number of voters to generate (default 100000).',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Random seed; the same seed always gives the same roll (default 0).',
+        )
+
+    def handle(self, *args, **options):
+        if options['count'] < 1:
+            raise CommandError('--count must be at least 1.')
+
+        with open(options['csv_file'], 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(generate_voter_rows(options['count'], seed=options['seed']))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {options['count']:,} synthetic voters to {options['csv_file']}."
+        ))
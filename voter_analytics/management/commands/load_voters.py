@@ -0,0 +1,95 @@
+# File: load_voters.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Management command that loads the Newton voter CSV into
+# the database using the streaming bulk loader (or incrementally syncs it
+# with --sync), then reports throughput and any rejected rows.
+
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from voter_analytics.loading import DEFAULT_BATCH_SIZE, VoterTableNotEmpty, load_voters, sync_voters
+
+
+class Command(BaseCommand):
+    help = 'Loads voters from a Newton voter CSV file using batched bulk inserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Path to the voter CSV file.')
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f'Rows written per bulk insert (default {DEFAULT_BATCH_SIZE}).',
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Delete all existing voters before loading, in the same transaction.',
+        )
+        parser.add_argument(
+            '--sync', action='store_true',
+            help='Incrementally sync on voter_id: insert new voters, update changed ones only.',
+        )
+        parser.add_argument(
+            '--tombstone', action='store_true',
+            help='With --sync, mark voters missing from the file as inactive.',
+        )
+        parser.add_argument(
+            '--rejects-file',
+            help='Write every rejected row, with its line number and error, to this CSV file.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        if options['sync'] and options['clear']:
+            raise CommandError('--sync and --clear cannot be used together.')
+        if options['tombstone'] and not options['sync']:
+            raise CommandError('--tombstone requires --sync.')
+
+        try:
+            if options['sync']:
+                stats = sync_voters(
+                    options['csv_file'],
+                    batch_size=options['batch_size'],
+                    tombstone=options['tombstone'],
+                )
+            else:
+                stats = load_voters(
+                    options['csv_file'],
+                    batch_size=options['batch_size'],
+                    clear=options['clear'],
+                )
+        except OSError as e:
+            raise CommandError(f"Could not read {options['csv_file']}: {e}")
+        except VoterTableNotEmpty as e:
+            raise CommandError(f"Could not load {options['csv_file']}: {e} (use --clear or --sync).")
+        except UnicodeDecodeError as e:
+            raise CommandError(f"Could not read {options['csv_file']}: it is not UTF-8 ({e}).")
+        except csv.Error as e:
+            raise CommandError(f"Could not parse {options['csv_file']} as CSV: {e}")
+
+        if options['sync']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Synced voters in {stats.seconds:.2f}s ({stats.rows_per_second:,.0f} rows/s): "
+                f"{stats.created} created, {stats.updated} updated, "
+                f"{stats.unchanged} unchanged, {stats.tombstoned} tombstoned."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Loaded {stats.loaded} voters in {stats.seconds:.2f}s "
+                f"({stats.rows_per_second:,.0f} rows/s)."
+            ))
+
+        if stats.rejected:
+            self.stdout.write(self.style.WARNING(f"Rejected {stats.rejected} rows."))
+
+            # Show the first few rejects inline, the rest go to the rejects file
+            for line_num, fields, error in stats.rejected_rows[:10]:
+                self.stdout.write(f"  line {line_num}: {error}")
+
+            if options['rejects_file']:
+                with open(options['rejects_file'], 'w', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(['line', 'error', 'fields'])
+                    for line_num, fields, error in stats.rejected_rows:
+                        writer.writerow([line_num, error, ','.join(fields)])
+                self.stdout.write(f"Wrote rejected rows to {options['rejects_file']}.")
@@ -0,0 +1,18 @@
+# File: rebuild_voter_aggregates.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Management command that rebuilds the data derived from the
+# Voter table (the aggregate cube) without reloading the voter file.
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from voter_analytics.loading import refresh_derived_data
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the voter aggregate cube and other derived voter data.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            refresh_derived_data()
+        self.stdout.write(self.style.SUCCESS("Rebuilt derived voter data."))
@@ -0,0 +1,31 @@
+# File: score_turnout.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Management command that recomputes the turnout propensity
+# score of every active voter (meant to be run nightly) and reports how
+# long the job took.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from voter_analytics.scoring import DEFAULT_CHUNK_SIZE, np, score_voters
+
+
+class Command(BaseCommand):
+    help = 'Computes a turnout propensity score for every active voter.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help=f'Voters scored and written per chunk (default {DEFAULT_CHUNK_SIZE}).',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        if np is None:
+            raise CommandError('Turnout scoring requires NumPy.')
+
+        run = score_voters(chunk_size=options['chunk_size'])
+        rate = run.voter_count / run.seconds if run.seconds else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {run.voter_count:,} voters in {run.seconds:.2f}s ({rate:,.0f} voters/s)."
+        ))
@@ -0,0 +1,87 @@
+# File: voter_storage_report.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Management command that reports how much space the Voter
+# table and its indexes take and times a few representative queries, to
+# compare storage schemas before and after a migration.
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+
+from voter_analytics.models import Voter
+
+# Representative queries: (label, function running the query)
+QUERIES = [
+    ('count by party', lambda: list(Voter.objects.values('party').annotate(n=Count('pk')).order_by())),
+    ('count by zip code', lambda: list(Voter.objects.values('zip_code').annotate(n=Count('pk')).order_by())),
+    ('count by street', lambda: list(Voter.objects.values('street_name').annotate(n=Count('pk')).order_by())),
+    ('zip code equals', lambda: Voter.objects.filter(zip_code='02459').count()),
+    ('voter_id lookup', lambda: list(Voter.objects.filter(voter_id='00000042X'))),
+    ('row hashes (sync)', lambda: len(list(Voter.objects.values_list('voter_id', 'row_hash')))),
+]
+
+
+def relation_sizes():
+    """Return [(name, bytes)] for the Voter table and its indexes, largest first.
+
+    Uses the dbstat virtual table on SQLite and pg_relation_size on
+    PostgreSQL; returns None on other databases.
+    """
+
+    table = Voter._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT name, SUM(pgsize) FROM dbstat WHERE name = %s OR name IN "
+                "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s) "
+                "GROUP BY name ORDER BY 2 DESC",
+                [table, table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                "SELECT c.relname, pg_relation_size(c.oid) FROM pg_class c "
+                "WHERE c.relname = %s OR c.oid IN "
+                "(SELECT indexrelid FROM pg_index WHERE indrelid = %s::regclass) ORDER BY 2 DESC",
+                [table, table],
+            )
+        else:
+            return None
+        return cursor.fetchall()
+
+
+class Command(BaseCommand):
+    help = 'Reports the storage size of the Voter table and times representative queries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Times each query is run; the median is reported (default 5).',
+        )
+
+    def handle(self, *args, **options):
+        voters = Voter.objects.count()
+        self.stdout.write(f"Voters: {voters:,}")
+
+        sizes = relation_sizes()
+        if sizes is None:
+            self.stdout.write("Table sizes are not available on this database.")
+        else:
+            table = Voter._meta.db_table
+            for name, size in sizes:
+                per_row = f" ({size / voters:.0f} bytes/voter)" if name == table and voters else ""
+                self.stdout.write(f"  {name:<45} {size / 1024:>9,.0f} KB{per_row}")
+            self.stdout.write(f"  {'total':<45} {sum(size for _, size in sizes) / 1024:>9,.0f} KB")
+
+        self.stdout.write("Query times (median):")
+        for label, query in QUERIES:
+            timings = []
+            for _ in range(max(options['repeat'], 1)):
+                start = time.perf_counter()
+                query()
+                timings.append(time.perf_counter() - start)
+            self.stdout.write(f"  {label:<45} {statistics.median(timings) * 1000:>9.1f} ms")
+
+        self.stdout.write(self.style.SUCCESS("Storage report complete."))
@@ -0,0 +1,69 @@
+# File: metadata.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Filter-option metadata for the voter analytics filter form.
+# Computes the party, voter score and birth year choices once per data
+# load from the aggregate cube and keeps them in the cache, so the views
+# never run SELECT DISTINCT over the Voter table.
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Min
+
+from .aggregates import get_data_version
+from .models import VoterAggregate
+
+# Birth years offered when there is no voter data yet
+DEFAULT_BIRTH_YEARS = (1920, 2004)
+
+# Seconds the filter choices stay cached; a new data version replaces them sooner
+OPTIONS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def compute_filter_options():
+    """Return the filter choices computed from the VoterAggregate cube.
+
+    The cube has one row per distinct (party, score, birth year, flags)
+    combination, so these queries touch a few thousand rows at most.
+    """
+
+    parties = list(
+        VoterAggregate.objects.values_list('party', flat=True).distinct().order_by('party')
+    )
+    voter_scores = list(
+        VoterAggregate.objects.values_list('voter_score', flat=True).distinct().order_by('voter_score')
+    )
+    years = VoterAggregate.objects.aggregate(first=Min('birth_year'), last=Max('birth_year'))
+    first = years['first'] or DEFAULT_BIRTH_YEARS[0]
+    last = years['last'] or DEFAULT_BIRTH_YEARS[1]
+
+    return {
+        'parties': parties,
+        'voter_scores': voter_scores,
+        'birth_years': list(range(first, last + 1)),
+    }
+
+
+def get_filter_options(version=None):
+    """Return the cached filter choices for the current voter data.
+
+    The entry is keyed on the shared data version (see
+    aggregates.get_data_version), so every process stops using it as soon
+    as a load commits, and computes the new choices once per data load.
+    Pass the version if the caller has already read it.
+    """
+
+    if version is None:
+        version = get_data_version()
+    return cache.get_or_set(
+        f'voter_analytics:filter_options:{version}', compute_filter_options, OPTIONS_CACHE_TIMEOUT
+    )
+
+
+def refresh_filter_options():
+    """Recompute the cached filter choices once the current load commits.
+
+    This only warms the cache of the process running the load; with the
+    default per-process cache, web processes compute the choices on their
+    first request after the load instead.
+    """
+    transaction.on_commit(get_filter_options)
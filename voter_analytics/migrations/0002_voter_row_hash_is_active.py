@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="voter",
+            name="is_active",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name="voter",
+            name="row_hash",
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.AlterField(
+            model_name="voter",
+            name="voter_id",
+            field=models.TextField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:04
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractYear
+
+ELECTION_FIELDS = ["v20state", "v21town", "v21primary", "v22general", "v23town"]
+
+
+def build_voter_aggregates(apps, schema_editor):
+    """Populate the aggregate cube from the voters already in the database."""
+    Voter = apps.get_model("voter_analytics", "Voter")
+    VoterAggregate = apps.get_model("voter_analytics", "VoterAggregate")
+
+    cells = (
+        Voter.objects.filter(is_active=True)
+        .annotate(birth_year=ExtractYear("date_birth"))
+        .values("party", "voter_score", "birth_year", *ELECTION_FIELDS)
+        .annotate(voter_count=Count("pk"))
+        .order_by()
+    )
+    VoterAggregate.objects.bulk_create(
+        [VoterAggregate(**cell) for cell in cells], batch_size=5000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0002_voter_row_hash_is_active"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VoterAggregate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("party", models.TextField()),
+                ("voter_score", models.IntegerField()),
+                ("birth_year", models.IntegerField()),
+                ("v20state", models.BooleanField()),
+                ("v21town", models.BooleanField()),
+                ("v21primary", models.BooleanField()),
+                ("v22general", models.BooleanField()),
+                ("v23town", models.BooleanField()),
+                ("voter_count", models.IntegerField()),
+            ],
+        ),
+        migrations.RunPython(build_voter_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0003_voteraggregate"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                fields=["party", "voter_score", "date_birth"],
+                name="voter_party_score_birth_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                fields=["party", "date_birth"], name="voter_party_birth_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                fields=["voter_score", "date_birth"], name="voter_score_birth_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(fields=["date_birth"], name="voter_birth_idx"),
+        ),
+    ]
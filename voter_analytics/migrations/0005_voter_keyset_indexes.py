@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0004_voter_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(fields=["party"], name="voter_party_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(fields=["voter_score"], name="voter_score_idx"),
+        ),
+    ]
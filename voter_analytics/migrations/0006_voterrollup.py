@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:14
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Q
+
+ELECTION_FIELDS = ["v20state", "v21town", "v21primary", "v22general", "v23town"]
+ROLLUP_FIELDS = {"precinct": "precinct_num", "street": "street_name"}
+
+
+def build_voter_rollups(apps, schema_editor):
+    """Populate the precinct and street rollups from the voters already in the database."""
+    Voter = apps.get_model("voter_analytics", "Voter")
+    VoterRollup = apps.get_model("voter_analytics", "VoterRollup")
+
+    voters = Voter.objects.filter(is_active=True).order_by()
+    rollups = []
+    for level, field in ROLLUP_FIELDS.items():
+        party_counts = {}
+        for row in voters.values(field, "party").annotate(count=Count("pk")):
+            party_counts.setdefault(row[field], {})[row["party"]] = row["count"]
+
+        totals = voters.values(field).annotate(
+            voter_count=Count("pk"),
+            avg_voter_score=Avg("voter_score"),
+            **{name: Count("pk", filter=Q(**{name: True})) for name in ELECTION_FIELDS}
+        )
+        for row in totals:
+            name = row.pop(field)
+            rollups.append(
+                VoterRollup(
+                    level=level, name=name, party_counts=party_counts[name], **row
+                )
+            )
+
+    VoterRollup.objects.bulk_create(rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0005_voter_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VoterRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "level",
+                    models.CharField(
+                        choices=[("precinct", "Precinct"), ("street", "Street")],
+                        max_length=8,
+                    ),
+                ),
+                ("name", models.TextField()),
+                ("voter_count", models.IntegerField()),
+                ("party_counts", models.JSONField(default=dict)),
+                ("v20state", models.IntegerField()),
+                ("v21town", models.IntegerField()),
+                ("v21primary", models.IntegerField()),
+                ("v22general", models.IntegerField()),
+                ("v23town", models.IntegerField()),
+                ("avg_voter_score", models.FloatField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["level", "name"], name="voterrollup_level_name_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(build_voter_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:15
+
+from django.db import migrations
+
+SEARCH_TABLE = "voter_analytics_votersearch"
+SEARCH_FIELDS = ["last_name", "first_name", "street_name", "street_num"]
+
+
+def create_voter_search(apps, schema_editor):
+    """Create and fill the FTS5 trigram search table (SQLite only)."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    columns = ", ".join(SEARCH_FIELDS)
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5({columns}, tokenize='trigram')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, {columns}) "
+        f"SELECT id, {columns} FROM voter_analytics_voter WHERE is_active"
+    )
+
+
+def drop_voter_search(apps, schema_editor):
+    """Drop the FTS5 search table (SQLite only)."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0006_voterrollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_voter_search, drop_voter_search),
+    ]
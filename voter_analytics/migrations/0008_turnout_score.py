@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0007_voter_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TurnoutScoreRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started", models.DateTimeField(auto_now_add=True)),
+                ("voter_count", models.IntegerField(default=0)),
+                ("seconds", models.FloatField(default=0.0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="voter",
+            name="turnout_score",
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
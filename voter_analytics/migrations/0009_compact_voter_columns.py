@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:21
+
+from django.db import migrations, models
+from django.db.models.functions import Length, Substr
+
+# Columns narrowed by this migration and their new lengths
+COMPACT_LENGTHS = {"party": 3, "precinct_num": 8, "street_num": 10}
+
+
+def compact_voter_values(apps, schema_editor):
+    """Fit existing voters to the compact columns before they are narrowed.
+
+    Row hashes keep their first 16 hex characters, which is what the
+    loader now computes, so the next sync does not see every voter as
+    changed. Zip codes are normalized to five digits like the loader does,
+    and ones that are not zip codes are blanked (as the loader stores
+    them). A party, precinct or street number longer than its new column
+    is not cut: the migration fails and lists those voters, so they can
+    be fixed first.
+    """
+    Voter = apps.get_model("voter_analytics", "Voter")
+
+    too_long = []
+    for field, length in COMPACT_LENGTHS.items():
+        rows = Voter.objects.annotate(n=Length(field)).filter(n__gt=length)
+        for voter_id, value in rows.values_list("voter_id", field):
+            too_long.append(f"{voter_id} ({field}={value!r})")
+    if too_long:
+        raise ValueError(
+            "Voters with values too long for the compact columns; fix them and "
+            f"migrate again: {', '.join(too_long[:50])}"
+            + (f" and {len(too_long) - 50} more" if len(too_long) > 50 else "")
+        )
+
+    Voter.objects.update(row_hash=Substr("row_hash", 1, 16))
+
+    voters = []
+    for voter in Voter.objects.exclude(zip_code__regex=r"^[0-9]{5}$").exclude(
+        zip_code=""
+    ):
+        digits = voter.zip_code.split("-")[0].strip()
+        if digits.isdigit() and len(digits) <= 5:
+            voter.zip_code = digits.zfill(5)
+        elif digits.isdigit() and len(digits) == 9:
+            voter.zip_code = digits[:5]
+        else:
+            voter.zip_code = ""
+        voters.append(voter)
+    Voter.objects.bulk_update(voters, ["zip_code"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0008_turnout_score"),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_voter_values, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="voter",
+            name="party",
+            field=models.CharField(max_length=3),
+        ),
+        migrations.AlterField(
+            model_name="voter",
+            name="precinct_num",
+            field=models.CharField(max_length=8),
+        ),
+        migrations.AlterField(
+            model_name="voter",
+            name="row_hash",
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AlterField(
+            model_name="voter",
+            name="street_num",
+            field=models.CharField(max_length=10),
+        ),
+        migrations.AlterField(
+            model_name="voter",
+            name="zip_code",
+            field=models.CharField(max_length=5),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:40
+
+from django.db import migrations, models
+
+
+def remove_duplicate_voters(apps, schema_editor):
+    """Keep one row per voter_id before voter_id becomes unique.
+
+    Loads without --clear appended another copy of every voter. For each
+    voter_id the active row loaded last (highest pk) is kept. Rebuild the
+    derived data (rebuild_voter_aggregates) afterwards if rows were removed.
+    """
+    Voter = apps.get_model("voter_analytics", "Voter")
+
+    duplicates = []
+    previous = None
+    rows = Voter.objects.order_by("voter_id", "-is_active", "-pk").values_list(
+        "pk", "voter_id"
+    )
+    for pk, voter_id in rows.iterator(chunk_size=5000):
+        if voter_id == previous:
+            duplicates.append(pk)
+        previous = voter_id
+
+    for i in range(0, len(duplicates), 500):
+        Voter.objects.filter(pk__in=duplicates[i : i + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0009_compact_voter_columns"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_voters, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="voter",
+            name="voter_id",
+            field=models.TextField(unique=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0010_voter_id_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VoterDataVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
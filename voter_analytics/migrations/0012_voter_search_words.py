@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:52
+
+from django.db import migrations
+
+WORDS_TABLE = "voter_analytics_voterwords"
+SEARCH_FIELDS = ["last_name", "first_name", "street_name", "street_num"]
+
+
+def create_voter_words(apps, schema_editor):
+    """Create and fill the FTS5 whole-word search table (SQLite only)."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    columns = ", ".join(SEARCH_FIELDS)
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {WORDS_TABLE} USING fts5({columns}, tokenize='unicode61', prefix='1 2')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {WORDS_TABLE} (rowid, {columns}) "
+        f"SELECT id, {columns} FROM voter_analytics_voter WHERE is_active"
+    )
+
+
+def drop_voter_words(apps, schema_editor):
+    """Drop the FTS5 whole-word search table (SQLite only)."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE {WORDS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0011_voterdataversion"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_voter_words, drop_voter_words),
+    ]
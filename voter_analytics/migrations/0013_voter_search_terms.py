@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:10
+
+from django.db import migrations
+
+WORDS_TABLE = "voter_analytics_voterwords"
+VOCAB_TABLE = "voter_analytics_voterwords_vocab"
+TERMS_TABLE = "voter_analytics_voterterms"
+
+
+def create_voter_terms(apps, schema_editor):
+    """Create the vocabulary of the words table and the typo-correction table (SQLite only)."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {VOCAB_TABLE} USING fts5vocab({WORDS_TABLE}, 'row')"
+    )
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {TERMS_TABLE} USING fts5(term, tokenize='trigram')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {TERMS_TABLE} (term) SELECT term FROM {VOCAB_TABLE}"
+    )
+
+
+def drop_voter_terms(apps, schema_editor):
+    """Drop the typo-correction and vocabulary tables (SQLite only)."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE {TERMS_TABLE}")
+    schema_editor.execute(f"DROP TABLE {VOCAB_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0012_voter_search_words"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_voter_terms, drop_voter_terms),
+    ]
@@ -8,6 +8,9 @@ from django.db import models
 
 # Create your models here.
 
+# Election participation flags tracked for every voter, in CSV order
+ELECTION_FIELDS = ['v20state', 'v21town', 'v21primary', 'v22general', 'v23town']
+
 class Voter(models.Model):
     """Represents a registered voter in Newton, MA.
     
@@ -15,20 +18,22 @@ class Voter(models.Model):
     affiliation, and participation history in five recent elections.
     """
 
-    voter_id = models.TextField()
+    # Key of the voter in the voter file; loads and syncs match voters on it
+    voter_id = models.TextField(unique=True)
     last_name = models.TextField()
     first_name = models.TextField()
-    street_num = models.TextField()
+    street_num = models.CharField(max_length=10)
     street_name  = models.TextField()
     apt_num = models.TextField()
-    zip_code = models.TextField()
+    # Always five digits; the loader normalizes ZIP+4 and lost leading zeros
+    zip_code = models.CharField(max_length=5)
 
     date_birth = models.DateField()
     date_registration = models.DateField()
-    party = models.TextField()
+    party = models.CharField(max_length=3)
 
     #WATCH OUT (At first glance it looks like an integer, but it can have alpha characters too)
-    precinct_num = models.TextField()
+    precinct_num = models.CharField(max_length=8)
 
     v20state = models.BooleanField()
     v21town = models.BooleanField()
@@ -38,64 +43,148 @@ class Voter(models.Model):
 
     voter_score = models.IntegerField()
 
+    # Fingerprint of the CSV row this voter was loaded from (64 bits of
+    # SHA-1 as hex), used by incremental reloads to detect changed records
+    row_hash = models.CharField(max_length=16, blank=True)
+
+    # False once the voter has disappeared from the voter file (tombstoned)
+    is_active = models.BooleanField(default=True)
+
+    # Estimated probability (0-1) of voting in the next election, written by
+    # the score_turnout command; None until the voter has been scored
+    turnout_score = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        # Composite indexes matching the filter combinations used together
+        # by the voter list and graph views. The election flags are left out:
+        # each one matches about half the roll, so an index would not help.
+        indexes = [
+            models.Index(fields=['party', 'voter_score', 'date_birth'], name='voter_party_score_birth_idx'),
+            models.Index(fields=['party', 'date_birth'], name='voter_party_birth_idx'),
+            models.Index(fields=['voter_score', 'date_birth'], name='voter_score_birth_idx'),
+            models.Index(fields=['date_birth'], name='voter_birth_idx'),
+            # Single-column indexes end in the primary key, so keyset pages
+            # filtered on party or score seek on (column, pk) without sorting
+            models.Index(fields=['party'], name='voter_party_idx'),
+            models.Index(fields=['voter_score'], name='voter_score_idx'),
+        ]
+
     def __str__(self):
         """Return string representation of voter with ID and full name."""
         return f"{self.voter_id}: {self.first_name} {self.last_name}"
 
-def load_data():
-    """Load voter data from CSV file into Django database.
-    
-    Reads newton_voters.csv and creates Voter objects for each valid record.
-    Handles data type conversions including boolean election participation
-    fields and strips whitespace from all text fields.
+class VoterAggregate(models.Model):
+    """One cell of the precomputed voter aggregate cube.
+
+    Holds the number of active voters sharing a party, voter score, birth
+    year and combination of the five election flags. Every filter the
+    voter views support is a predicate on these columns, so any filtered
+    count or chart can be answered by summing a few cube rows instead of
+    scanning Voter. Rebuilt by the voter loader after every load.
     """
 
-    filename = '/home/dany/Downloads/newton_voters.csv'
-
-
-    #Read file
-    f = open(filename, 'r')
-
-    #Discard headers
-    f.readline()
-
-    for line in f:
-        fields = line.split(',')
-       
-        try:
-            # create a new instance of Result object with this record from CSV
-            voter = Voter(
-                        voter_id = fields[0].strip(),
-                        last_name = fields[1].strip(),
-                        first_name = fields[2].strip(),
-                        street_num = fields[3].strip(),
-                        street_name  = fields[4].strip(),
-                        apt_num = fields[5].strip(),
-                        zip_code = fields[6].strip(),
-
-                        date_birth = fields[7].strip(),
-                        date_registration = fields[8].strip(),
-                        party = fields[9].strip(),
-
-                        precinct_num = fields[10].strip(),
-
-                        v20state = fields[11].strip().upper() == 'TRUE',
-                        v21town = fields[12].strip().upper() == 'TRUE',
-                        v21primary = fields[13].strip().upper() == 'TRUE',
-                        v22general = fields[14].strip().upper() == 'TRUE',
-                        v23town = fields[15].strip().upper() == 'TRUE',
-
-                        voter_score = int(fields[16].strip()),
-                    )
- 
-            voter.save() # commit to database            
-        except Exception as e:
-            print(f"Skipped: {fields}")
-            print(f"Error: {e}")
-    
-    print(f'Done. Created {Voter.objects.all().count()} Voters.')
+    party = models.TextField()
+    voter_score = models.IntegerField()
+    birth_year = models.IntegerField()
+
+    v20state = models.BooleanField()
+    v21town = models.BooleanField()
+    v21primary = models.BooleanField()
+    v22general = models.BooleanField()
+    v23town = models.BooleanField()
+
+    voter_count = models.IntegerField()
+
+    def __str__(self):
+        """Return string representation of the cube cell and its count."""
+        return f"{self.party}/{self.voter_score}/{self.birth_year}: {self.voter_count}"
+
+class VoterDataVersion(models.Model):
+    """Version of the loaded voter data, shared by every process.
+
+    A single row, rewritten in the same transaction that rebuilds the
+    derived voter data. Cache keys and the in-memory chart engines include
+    the version, so every web process stops serving results computed from
+    older data as soon as a load (from any process) commits.
+    """
+
+    version = models.BigIntegerField(default=0)
 
+    def __str__(self):
+        """Return string representation of the data version."""
+        return f"Voter data version {self.version}"
+
+class VoterRollup(models.Model):
+    """Precomputed neighbourhood summary of the active voters.
+
+    One row per precinct and one per street: registration count, party
+    mix, number of voters who voted in each tracked election and average
+    voter score. Rebuilt by the voter loader after every load, so turf
+    summaries never re-aggregate the Voter table per request.
+    """
+
+    PRECINCT = 'precinct'
+    STREET = 'street'
+    LEVEL_CHOICES = [(PRECINCT, 'Precinct'), (STREET, 'Street')]
+
+    level = models.CharField(max_length=8, choices=LEVEL_CHOICES)
+    # Precinct number or street name, depending on the level
+    name = models.TextField()
+
+    voter_count = models.IntegerField()
+    # Party -> number of voters
+    party_counts = models.JSONField(default=dict)
+
+    # Number of voters who voted in each election
+    v20state = models.IntegerField()
+    v21town = models.IntegerField()
+    v21primary = models.IntegerField()
+    v22general = models.IntegerField()
+    v23town = models.IntegerField()
+
+    avg_voter_score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['level', 'name'], name='voterrollup_level_name_idx'),
+        ]
+
+    def turnout(self):
+        """Return (election, voters who voted, percent of registered voters) for each election."""
+        return [
+            (name, getattr(self, name), 100 * getattr(self, name) / self.voter_count if self.voter_count else 0)
+            for name in ELECTION_FIELDS
+        ]
 
-            
+    def __str__(self):
+        """Return string representation of the rollup and its voter count."""
+        return f"{self.get_level_display()} {self.name}: {self.voter_count}"
+
+class TurnoutScoreRun(models.Model):
+    """One run of the turnout scoring job, kept so its runtime can be tracked."""
+
+    started = models.DateTimeField(auto_now_add=True)
+    voter_count = models.IntegerField(default=0)
+    seconds = models.FloatField(default=0.0)
 
+    def __str__(self):
+        """Return string representation of the run with its size and runtime."""
+        return f"{self.started:%Y-%m-%d %H:%M}: {self.voter_count} voters in {self.seconds:.2f}s"
 
+def load_data(filename='/home/dany/Downloads/newton_voters.csv'):
+    """Load voter data from CSV file into Django database.
+    
+    Kept for use from the Django shell; delegates to the streaming bulk
+    loader used by the load_voters management command, which parses the
+    file with the csv module and writes rows in batched inserts.
+    """
+
+    from .loading import load_voters
+
+    stats = load_voters(filename)
+
+    for line_num, fields, error in stats.rejected_rows:
+        print(f"Skipped line {line_num}: {fields}")
+        print(f"Error: {error}")
+    
+    print(f'Done. Created {stats.loaded} Voters in {stats.seconds:.2f}s.')
@@ -0,0 +1,79 @@
+# File: pagination.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Keyset (seek) pagination for the voter analytics list.
+# Pages are fetched with "WHERE pk > cursor ORDER BY pk LIMIT n" instead
+# of OFFSET, so every page costs the same and no COUNT query is needed.
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset.
+
+    Mirrors the parts of Django's Page that the templates use
+    (object_list, has_next, has_previous) and exposes the cursors for the
+    neighbouring pages instead of page numbers.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        """Return True if there is a page after this one."""
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        """Return True if there is a page before this one."""
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        """Return True if there is a page before or after this one."""
+        return self.has_next() or self.has_previous()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def parse_cursor(value):
+    """Return a cursor from a GET parameter as an int, or None if missing or invalid."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def keyset_paginate(queryset, page_size, after=None, before=None):
+    """Return the KeysetPage of queryset that follows `after` or precedes `before`.
+
+    Cursors are primary keys. With neither cursor the first page is
+    returned. One extra row is fetched to find out whether another page
+    exists in the direction of travel, so each page is a single indexed
+    range query regardless of how deep into the results it is.
+    """
+
+    if before is not None:
+        rows = list(queryset.filter(pk__lt=before).order_by('-pk')[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        if not rows:
+            return keyset_paginate(queryset, page_size)
+        return KeysetPage(
+            rows,
+            next_cursor=rows[-1].pk,
+            previous_cursor=rows[0].pk if has_more else None,
+        )
+
+    if after is not None:
+        queryset = queryset.filter(pk__gt=after)
+
+    rows = list(queryset.order_by('pk')[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    return KeysetPage(
+        rows,
+        next_cursor=rows[-1].pk if has_more else None,
+        previous_cursor=rows[0].pk if after is not None and rows else None,
+    )
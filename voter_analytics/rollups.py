@@ -0,0 +1,53 @@
+# File: rollups.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Precinct- and street-level rollups of the voter roll.
+# Aggregates registration counts, party mix, election turnout and average
+# voter score per neighbourhood into the VoterRollup table at load time.
+
+from django.db.models import Avg, Count, Q
+
+from .models import ELECTION_FIELDS, Voter, VoterRollup
+
+# Rollup level -> Voter field that names the neighbourhood
+ROLLUP_FIELDS = {
+    VoterRollup.PRECINCT: 'precinct_num',
+    VoterRollup.STREET: 'street_name',
+}
+
+# VoterRollup fields returned by the JSON endpoint
+ROLLUP_VALUES = ['name', 'voter_count', 'party_counts', *ELECTION_FIELDS, 'avg_voter_score']
+
+
+def compute_rollups(level):
+    """Return unsaved VoterRollup rows for one level, built with two grouped queries."""
+
+    field = ROLLUP_FIELDS[level]
+    voters = Voter.objects.filter(is_active=True).order_by()
+
+    party_counts = {}
+    for row in voters.values(field, 'party').annotate(count=Count('pk')).order_by(field, 'party'):
+        party_counts.setdefault(row[field], {})[row['party']] = row['count']
+
+    totals = voters.values(field).annotate(
+        voter_count=Count('pk'),
+        avg_voter_score=Avg('voter_score'),
+        **{name: Count('pk', filter=Q(**{name: True})) for name in ELECTION_FIELDS}
+    )
+
+    rollups = []
+    for row in totals:
+        name = row.pop(field)
+        rollups.append(VoterRollup(level=level, name=name, party_counts=party_counts[name], **row))
+    return rollups
+
+
+def rebuild_voter_rollups():
+    """Rebuild the VoterRollup table from the active voters.
+
+    Returns the number of rollup rows written.
+    """
+
+    rollups = [rollup for level in ROLLUP_FIELDS for rollup in compute_rollups(level)]
+    VoterRollup.objects.all().delete()
+    VoterRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
@@ -0,0 +1,112 @@
+# File: scoring.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Turnout propensity scoring for the voter roll. Scores every
+# active voter from participation history, age and registration tenure
+# with vectorized NumPy arithmetic, streaming the roll in primary key
+# chunks and writing the scores back with batched UPDATE statements.
+
+import time
+from datetime import date
+
+from django.db import connection, transaction
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed by the scoring job
+    np = None
+
+from .models import ELECTION_FIELDS, TurnoutScoreRun, Voter
+
+# Voters read, scored and written per chunk
+DEFAULT_CHUNK_SIZE = 5000
+
+# Logistic model weights. There is no labelled turnout data to fit them,
+# so they are set by hand: recent and low-turnout (town, primary)
+# elections count more, turnout rises with age up to about 75 and with
+# years on the roll.
+INTERCEPT = -2.0
+ELECTION_WEIGHTS = {
+    'v20state': 0.5,
+    'v21town': 0.9,
+    'v21primary': 0.9,
+    'v22general': 0.7,
+    'v23town': 1.1,
+}
+AGE_WEIGHT = 0.02       # per year of age above 45, capped at 75
+TENURE_WEIGHT = 0.35    # per log(1 + years registered)
+
+
+def turnout_scores(participation, birth_years, registration_years, year):
+    """Return the turnout propensity (0-1) of a batch of voters as a NumPy array.
+
+    participation is an (n, 5) boolean array in ELECTION_FIELDS order;
+    birth_years and registration_years are length-n integer arrays and
+    year is the year the scores are computed for.
+    """
+
+    weights = np.array([ELECTION_WEIGHTS[name] for name in ELECTION_FIELDS])
+    age = np.clip(year - birth_years, 18, 75)
+    tenure = np.clip(year - registration_years, 0, None)
+
+    z = (
+        INTERCEPT
+        + participation @ weights
+        + AGE_WEIGHT * (age - 45)
+        + TENURE_WEIGHT * np.log1p(tenure)
+    )
+    return 1 / (1 + np.exp(-z))
+
+
+def write_scores(pks, scores):
+    """Write a chunk of scores back to the Voter table.
+
+    Uses one parameterized UPDATE run with executemany: bulk_update()
+    builds a CASE expression over every pk, and compiling it took over 90%
+    of the job's runtime.
+    """
+
+    table = Voter._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {table} SET turnout_score = %s WHERE id = %s",
+            [(round(float(score), 4), pk) for pk, score in zip(pks, scores)],
+        )
+
+
+def score_voters(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score every active voter and return the TurnoutScoreRun recording the job.
+
+    Voters are read in primary key order, chunk_size at a time, so memory
+    use does not grow with the roll. All updates are written in one
+    transaction.
+    """
+
+    start = time.perf_counter()
+    year = date.today().year
+    run = TurnoutScoreRun()
+
+    with transaction.atomic():
+        last_pk = 0
+        while True:
+            rows = list(
+                Voter.objects.filter(is_active=True, pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', 'date_birth', 'date_registration', *ELECTION_FIELDS)[:chunk_size]
+            )
+            if not rows:
+                break
+
+            pks = [row[0] for row in rows]
+            birth_years = np.fromiter((row[1].year for row in rows), dtype=np.int32, count=len(rows))
+            registration_years = np.fromiter((row[2].year for row in rows), dtype=np.int32, count=len(rows))
+            participation = np.array([row[3:] for row in rows], dtype=bool)
+
+            scores = turnout_scores(participation, birth_years, registration_years, year)
+            write_scores(pks, scores)
+
+            run.voter_count += len(rows)
+            last_pk = pks[-1]
+
+        run.seconds = time.perf_counter() - start
+        run.save()
+    return run
@@ -0,0 +1,213 @@
+# File: search.py
+# Author: Daniel Arteaga Mercado (d4nyart@bu.edu), 10/18/2026
+# Description: Name and address search over the voter roll. On SQLite the
+# active voters are indexed in FTS5 tables: one with the trigram tokenizer
+# finds words as substrings, one split into whole words finds short words
+# ("Li", "Wu") and word prefixes, and a trigram table of the distinct
+# words corrects misspelled ones. Other databases fall back to icontains.
+
+import difflib
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Voter
+
+# FTS5 table holding the searchable voter columns; its rowid is the voter pk
+SEARCH_TABLE = 'voter_analytics_votersearch'
+
+# FTS5 table of the same columns split into words (unicode61 tokenizer,
+# with one- and two-character prefix indexes), for words shorter than a trigram
+WORDS_TABLE = 'voter_analytics_voterwords'
+
+# fts5vocab table listing the distinct words of WORDS_TABLE
+VOCAB_TABLE = 'voter_analytics_voterwords_vocab'
+
+# FTS5 table (trigram tokenizer) of the distinct words, used to correct typos
+TERMS_TABLE = 'voter_analytics_voterterms'
+
+# Voter fields that are searched
+SEARCH_FIELDS = ['last_name', 'first_name', 'street_name', 'street_num']
+
+# Maximum number of voters a search returns
+SEARCH_LIMIT = 50
+
+# Words sharing trigrams with a misspelled word that are compared with it
+TYPO_CANDIDATES = 20
+
+# Corrections kept per misspelled word, and how close (difflib ratio) they must be
+TYPO_CORRECTIONS = 3
+TYPO_MIN_SIMILARITY = 0.6
+
+
+def search_available():
+    """Return True if the database has the FTS5 search tables."""
+    return connection.vendor == 'sqlite'
+
+
+def rebuild_voter_search():
+    """Rebuild the search tables from the active voters (SQLite only)."""
+
+    if not search_available():
+        return
+    columns = ', '.join(SEARCH_FIELDS)
+    with connection.cursor() as cursor:
+        for table in (SEARCH_TABLE, WORDS_TABLE):
+            cursor.execute(f"DELETE FROM {table}")
+            cursor.execute(
+                f"INSERT INTO {table} (rowid, {columns}) "
+                f"SELECT id, {columns} FROM {Voter._meta.db_table} WHERE is_active"
+            )
+        cursor.execute(f"DELETE FROM {TERMS_TABLE}")
+        cursor.execute(f"INSERT INTO {TERMS_TABLE} (term) SELECT term FROM {VOCAB_TABLE}")
+
+
+def search_words(text):
+    """Return the words of a search, upper-cased and without double quotes."""
+    words = (word.replace('"', '').upper() for word in text.split())
+    return [word for word in words if word]
+
+
+def exact_query(words):
+    """Return an FTS5 MATCH expression requiring every word as a substring (trigram table)."""
+    return ' AND '.join(f'"{word}"' for word in words)
+
+
+def token_query(words, prefix=False):
+    """Return an FTS5 MATCH expression requiring every word as a whole word, or as a word prefix (words table)."""
+    star = '*' if prefix else ''
+    return ' AND '.join(f'"{word}"{star}' for word in words)
+
+
+def trigram_query(word):
+    """Return an FTS5 MATCH expression OR-ing every trigram of a word."""
+    trigrams = {word[i:i + 3] for i in range(len(word) - 2)}
+    return ' OR '.join(f'"{trigram}"' for trigram in sorted(trigrams))
+
+
+def match_voter_pks(match, limit, exclude=(), table=SEARCH_TABLE, words_match=None):
+    """Return the pks of the first `limit` rows (in pk order) of a search table matching a MATCH expression.
+
+    words_match, if given, also requires the row to match it in the words
+    table. That MATCH runs once, as a subquery whose rowids SQLite keeps in
+    a list; the unary + on rowid stops SQLite from instead looking each of
+    those rowids up in `table`, which reruns the outer MATCH for every one.
+    """
+
+    sql = f"SELECT rowid FROM {table} WHERE {table} MATCH %s"
+    params = [match]
+    if words_match:
+        sql += f" AND +rowid IN (SELECT rowid FROM {WORDS_TABLE} WHERE {WORDS_TABLE} MATCH %s)"
+        params.append(words_match)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"{sql} ORDER BY rowid LIMIT %s", [*params, limit + len(exclude)])
+        return [pk for (pk,) in cursor.fetchall() if pk not in exclude][:limit]
+
+
+def correct_words(words):
+    """Return, for every word, the closest words of the roll, best first.
+
+    Words sharing trigrams with the search word are found in the terms
+    table and compared with difflib; a correctly spelled word is its own
+    best correction. Words without a close enough correction get [].
+    """
+
+    subqueries = [
+        f"SELECT * FROM (SELECT {index}, term FROM {TERMS_TABLE} WHERE {TERMS_TABLE} MATCH %s "
+        f"ORDER BY rank LIMIT {TYPO_CANDIDATES})"
+        for index in range(len(words))
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(' UNION ALL '.join(subqueries), [trigram_query(word) for word in words])
+        rows = cursor.fetchall()
+
+    corrections = []
+    for index, word in enumerate(words):
+        scored = [
+            (difflib.SequenceMatcher(None, word.lower(), term).ratio(), term)
+            for term_index, term in rows if term_index == index
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        corrections.append([term for ratio, term in scored[:TYPO_CORRECTIONS] if ratio >= TYPO_MIN_SIMILARITY])
+    return corrections
+
+
+def typo_queries(words):
+    """Return the words-table MATCH expressions that find voters despite typos, best first.
+
+    The first uses the best correction of every word, the second any of
+    the corrections. Words without a correction are left out.
+    """
+
+    corrections = [terms for terms in correct_words(words) if terms]
+    if not corrections:
+        return []
+
+    best = ' AND '.join(f'"{terms[0]}"' for terms in corrections)
+    wider = ' AND '.join('(' + ' OR '.join(f'"{term}"' for term in terms) + ')' for terms in corrections)
+    return [best] if wider == best else [best, wider]
+
+
+def search_passes(words):
+    """Yield the searches run for a list of words, best matches first.
+
+    Each pass is (MATCH expression, table, words MATCH expression). Words
+    of three or more characters are matched as substrings, then through
+    their typo corrections (only looked up if that pass is reached);
+    shorter words are matched as whole words, then as word prefixes.
+    """
+
+    long_words = [word for word in words if len(word) >= 3]
+    short_words = [word for word in words if len(word) < 3]
+
+    if not long_words:
+        yield token_query(short_words), WORDS_TABLE, None
+        yield token_query(short_words, prefix=True), WORDS_TABLE, None
+        return
+
+    yield exact_query(long_words), SEARCH_TABLE, short_words and token_query(short_words)
+    if short_words:
+        yield exact_query(long_words), SEARCH_TABLE, token_query(short_words, prefix=True)
+    for match in typo_queries(long_words):
+        if short_words:
+            match = f'{match} AND {token_query(short_words, prefix=True)}'
+        yield match, WORDS_TABLE, None
+
+
+def search_voters(text, limit=SEARCH_LIMIT):
+    """Return up to `limit` active voters matching a name or address search, best first.
+
+    Voters containing every word come first (they all match equally well,
+    so they are in pk order); if there are fewer than `limit` of them, the
+    rest are filled from the following passes of search_passes(), ending
+    with the voters matching corrected spellings of the words.
+    """
+
+    if not search_available():
+        return fallback_search_voters(text, limit)
+
+    words = search_words(text)
+    if not words:
+        return []
+
+    pks = []
+    for match, table, words_match in search_passes(words):
+        pks += match_voter_pks(match, limit - len(pks), set(pks), table, words_match)
+        if len(pks) >= limit:
+            break
+
+    voters = Voter.objects.in_bulk(pks)
+    return [voters[pk] for pk in pks if pk in voters]
+
+
+def fallback_search_voters(text, limit=SEARCH_LIMIT):
+    """Search with icontains on databases without the FTS5 table; every word must match a field."""
+
+    queryset = Voter.objects.filter(is_active=True)
+    for word in text.split():
+        word_matches = Q()
+        for field in SEARCH_FIELDS:
+            word_matches |= Q(**{f'{field}__icontains': word})
+        queryset = queryset.filter(word_matches)
+    return list(queryset.order_by('last_name', 'first_name')[:limit])
@@ -1,3 +1,508 @@
-from django.test import TestCase
+import csv
+import os
+import tempfile
+from io import StringIO
+from unittest import skipIf
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .aggregates import (
+    cube_chart_counts, get_chart_counts, get_data_version, get_voter_count, rebuild_voter_aggregates,
+    voter_chart_counts,
+)
+from .benchmarks import CSV_HEADER, generate_voter_rows, measure
+from .bitmaps import VoterBitmaps
+from .columnar import VoterColumns, np
+from .filters import VoterFilter
+from .metadata import get_filter_options
+from .loading import VoterTableNotEmpty, load_voters, normalize_zip_code, parse_voter_row, sync_voters
+from .models import ELECTION_FIELDS, TurnoutScoreRun, Voter, VoterRollup
+from .pagination import keyset_paginate
+from .rollups import rebuild_voter_rollups
+from .scoring import score_voters
+from .search import rebuild_voter_search, search_voters
+from .views import VoterListView, VoterListGraphsView
+
+
+class VoterFilterIndexTests(TestCase):
+    """Make sure the common voter filter combinations are answered from an
+    index (EXPLAIN shows a SEARCH) rather than a full table scan."""
+
+    FILTER_COMBINATIONS = [
+        {'party': 'D'},
+        {'party': 'R', 'voter_score': '3'},
+        {'party': 'D', 'min_birth_year': '1950', 'max_birth_year': '1970'},
+        {'party': 'U', 'voter_score': '5', 'min_birth_year': '1980', 'v20state': 'true'},
+        {'voter_score': '2'},
+        {'voter_score': '4', 'max_birth_year': '1960'},
+        {'min_birth_year': '1990'},
+        {'min_birth_year': '1940', 'max_birth_year': '1945', 'v22general': 'true'},
+    ]
+
+    def get_plan(self, view_class, params):
+        """Return the EXPLAIN output for a view's filter with these GET parameters.
+
+        Ordering is cleared: only the WHERE clause is under test here, the
+        ordered page queries are covered by the keyset test below.
+        """
+        view = view_class()
+        view.setup(RequestFactory().get('/', params))
+        return view.get_queryset().order_by().explain()
+
+    def test_filters_use_indexes(self):
+        for view_class in (VoterListView, VoterListGraphsView):
+            for params in self.FILTER_COMBINATIONS:
+                with self.subTest(view=view_class.__name__, params=params):
+                    plan = self.get_plan(view_class, params)
+                    self.assertIn('SEARCH voter_analytics_voter USING INDEX', plan)
+                    self.assertNotIn('SCAN voter_analytics_voter', plan)
+
+
+class VoterKeysetPaginationTests(TestCase):
+    """Keyset pages of the voter list seek on the primary key."""
+
+    def test_keyset_pages_seek_without_sorting(self):
+        for params in [{}, {'party': 'D'}, {'voter_score': '3'}]:
+            with self.subTest(params=params):
+                queryset = Voter.objects.filter(is_active=True, pk__gt=500, **params)
+                plan = queryset.order_by('pk')[:101].explain()
+                self.assertIn('SEARCH voter_analytics_voter', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_keyset_paginate_walks_forward_and_back(self):
+        Voter.objects.bulk_create([
+            Voter(voter_id=str(i), last_name='L', first_name='F', street_num='1',
+                  street_name='S', apt_num='', zip_code='02458',
+                  date_birth='1980-01-01', date_registration='2000-01-01',
+                  party='D', precinct_num='1', v20state=True, v21town=False,
+                  v21primary=False, v22general=True, v23town=False, voter_score=2)
+            for i in range(25)
+        ])
+        queryset = Voter.objects.order_by('pk')
+
+        first = keyset_paginate(queryset, 10)
+        second = keyset_paginate(queryset, 10, after=first.next_cursor)
+        third = keyset_paginate(queryset, 10, after=second.next_cursor)
+        back = keyset_paginate(queryset, 10, before=third.previous_cursor)
+
+        self.assertFalse(first.has_previous())
+        self.assertEqual(len(third), 5)
+        self.assertFalse(third.has_next())
+        self.assertEqual([v.pk for v in back], [v.pk for v in second])
+        self.assertEqual(len({v.pk for page in (first, second, third) for v in page}), 25)
+
+
+class VoterFilterTests(TestCase):
+    """The shared voter filter normalizes equivalent requests to one cache key."""
+
+    def test_equivalent_requests_share_a_cache_key(self):
+        first = VoterFilter({'voter_score': '03', 'party': 'D', 'page': '4', 'min_birth_year': 'abc'})
+        second = VoterFilter({'party': ' D ', 'voter_score': '3'})
+        self.assertEqual(first.querystring(), 'party=D&voter_score=3')
+        self.assertEqual(first.cache_key('cube'), second.cache_key('cube'))
+        self.assertNotEqual(first.cache_key('cube'), VoterFilter({'party': 'R'}).cache_key('cube'))
+
+
+class VoterDataVersionTests(TestCase):
+    """Results cached for older voter data are not served after a load in another process."""
+
+    def test_out_of_band_rebuild_misses_the_cache(self):
+        create_sample_voters()
+        rebuild_voter_aggregates()
+        old_key = VoterFilter({}).cache_key('cube')
+        self.assertEqual(cube_chart_counts(VoterFilter({}))['voter_count'], 50)
+
+        # A load from another process changes only the database: the entry
+        # cached here is untouched, but the shared version moves on
+        old_version = get_data_version()
+        Voter.objects.filter(party='R').update(is_active=False)
+        rebuild_voter_aggregates()
+
+        self.assertNotEqual(get_data_version(), old_version)
+        self.assertIsNotNone(cache.get(old_key))
+        self.assertNotEqual(VoterFilter({}).cache_key('cube'), old_key)
+        self.assertEqual(
+            cube_chart_counts(VoterFilter({}))['voter_count'],
+            Voter.objects.filter(is_active=True).count(),
+        )
+
+    def test_filter_options_follow_the_data_version(self):
+        create_sample_voters()
+        rebuild_voter_aggregates()
+        self.assertEqual(get_filter_options()['parties'], ['D', 'R', 'U'])
+
+        Voter.objects.filter(party='R').update(is_active=False)
+        rebuild_voter_aggregates()
+        self.assertEqual(get_filter_options()['parties'], ['D', 'U'])
+
+
+class VoterChartDataTests(TestCase):
+    """The chart data API returns compact series and supports revalidation."""
+
+    def test_chart_data_is_json_with_etag(self):
+        url = reverse('voter_chart_data') + '?party=D'
+        response = self.client.get(url)
+        data = response.json()
+        self.assertEqual(data['voter_count'], 0)
+        self.assertEqual(set(data), {'voter_count', 'birth_years', 'parties', 'elections'})
+        self.assertEqual(data['elections']['labels'][0], 'v20state')
+        self.assertIn('max-age', response['Cache-Control'])
+
+        revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_etag_changes_after_a_reload(self):
+        create_sample_voters()
+        rebuild_voter_aggregates()
+        url = reverse('voter_chart_data')
+        response = self.client.get(url)
+
+        # Reloaded elsewhere: revalidating the old ETag returns the new data
+        Voter.objects.filter(party='R').update(is_active=False)
+        rebuild_voter_aggregates()
+        revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertNotEqual(revalidated['ETag'], response['ETag'])
+        self.assertEqual(revalidated.json()['voter_count'], Voter.objects.filter(is_active=True).count())
+
+
+def create_sample_voters(count=50):
+    """Create a small, varied set of voters for comparing chart backends."""
+    Voter.objects.bulk_create([
+        Voter(voter_id=str(i), last_name='L', first_name='F', street_num='1',
+              street_name='S', apt_num='', zip_code='02458',
+              date_birth=f'{1950 + i % 7}-06-01', date_registration='2000-01-01',
+              party='DRU'[i % 3], precinct_num=str(i % 4), v20state=i % 2 == 0,
+              v21town=i % 5 == 0, v21primary=False, v22general=True,
+              v23town=i % 3 == 0, voter_score=i % 6)
+        for i in range(count)
+    ])
+
+
+# Filter combinations every chart backend must answer like the SQL one
+BACKEND_FILTERS = [
+    {}, {'party': 'R'}, {'party': 'X'},
+    {'voter_score': '2', 'min_birth_year': '1952', 'v20state': 'true'},
+    {'max_birth_year': '1953', 'v23town': 'false'},
+]
+
+
+class VoterCubeTests(TestCase):
+    """The aggregate cube agrees with the SQL aggregation after a rebuild."""
+
+    def test_cube_counts_match_sql(self):
+        create_sample_voters()
+        Voter.objects.filter(pk=Voter.objects.order_by('pk')[0].pk).update(is_active=False)
+        self.assertGreater(rebuild_voter_aggregates(), 0)
+        for params in BACKEND_FILTERS:
+            with self.subTest(params=params):
+                voter_filter = VoterFilter(params)
+                self.assertEqual(cube_chart_counts(voter_filter),
+                                 voter_chart_counts(voter_filter.voters()))
+
+
+@skipIf(np is None, 'NumPy is not installed')
+class VoterColumnsTests(TestCase):
+    """The columnar engine agrees with the SQL aggregation."""
+
+    def test_columnar_counts_match_sql(self):
+        create_sample_voters()
+        columns = VoterColumns(version=0)
+        for params in BACKEND_FILTERS:
+            with self.subTest(params=params):
+                voter_filter = VoterFilter(params)
+                self.assertEqual(columns.chart_counts(voter_filter),
+                                 voter_chart_counts(voter_filter.voters()))
+
+    @override_settings(VOTER_ANALYTICS_BACKEND='columnar')
+    def test_columns_reload_after_a_load_elsewhere(self):
+        create_sample_voters()
+        rebuild_voter_aggregates()
+        self.assertEqual(get_chart_counts(VoterFilter({}))['voter_count'], 50)
+
+        Voter.objects.filter(party='R').update(is_active=False)
+        rebuild_voter_aggregates()
+        self.assertNotIn('R', get_chart_counts(VoterFilter({}))['parties'])
+
+
+class VoterBitmapsTests(TestCase):
+    """The bitmap index agrees with the SQL aggregation, also after compression."""
+
+    def test_bitmap_counts_match_sql(self):
+        create_sample_voters()
+        bitmaps = VoterBitmaps.build(version=0)
+        restored = VoterBitmaps.decompress(0, bitmaps.compress())
+        for params in BACKEND_FILTERS:
+            with self.subTest(params=params):
+                voter_filter = VoterFilter(params)
+                expected = voter_chart_counts(voter_filter.voters())
+                self.assertEqual(bitmaps.chart_counts(voter_filter), expected)
+                self.assertEqual(restored.chart_counts(voter_filter), expected)
+
+    @override_settings(VOTER_ANALYTICS_BACKEND='bitmap')
+    def test_bitmaps_rebuild_after_a_load_elsewhere(self):
+        create_sample_voters()
+        rebuild_voter_aggregates()
+        self.assertEqual(get_voter_count(VoterFilter({'party': 'R'})), 17)
+
+        Voter.objects.filter(party='R').update(is_active=False)
+        rebuild_voter_aggregates()
+        self.assertEqual(get_voter_count(VoterFilter({'party': 'R'})), 0)
+
+
+class VoterExportTests(TestCase):
+    """The CSV export streams the filtered voters."""
+
+    def test_export_streams_filtered_rows(self):
+        create_sample_voters()
+        response = self.client.get(reverse('voter_export'), {'party': 'R'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('voter_id,last_name'))
+        self.assertEqual(len(lines) - 1, Voter.objects.filter(party='R').count())
+
+
+class VoterRollupTests(TestCase):
+    """Precinct and street rollups summarize the active voters."""
+
+    def test_rollups_match_voters(self):
+        create_sample_voters()
+        rebuild_voter_rollups()
+
+        precinct = VoterRollup.objects.get(level=VoterRollup.PRECINCT, name='1')
+        voters = Voter.objects.filter(precinct_num='1')
+        self.assertEqual(precinct.voter_count, voters.count())
+        self.assertEqual(precinct.v20state, voters.filter(v20state=True).count())
+        self.assertEqual(sum(precinct.party_counts.values()), precinct.voter_count)
+
+        street = VoterRollup.objects.get(level=VoterRollup.STREET, name='S')
+        self.assertEqual(street.voter_count, 50)
+
+        data = self.client.get(reverse('voter_rollup_data'), {'level': 'precinct'}).json()
+        self.assertEqual(len(data['rollups']), 4)
+        self.assertEqual(self.client.get(reverse('voter_rollups'), {'level': 'street'}).status_code, 200)
+
+
+class VoterSearchTests(TestCase):
+    """Name and address search finds voters, also with typos."""
+
+    def test_search_tolerates_typos(self):
+        create_sample_voters()
+        Voter.objects.filter(pk=Voter.objects.order_by('pk')[0].pk).update(
+            last_name='WHITTAKER', first_name='ELEANOR', street_name='WALNUT ST')
+        rebuild_voter_search()
+
+        for query in ['whittaker', 'eleanor whitaker', 'Elanor Wittaker', 'walnut']:
+            with self.subTest(query=query):
+                self.assertEqual(search_voters(query)[0].last_name, 'WHITTAKER')
+        self.assertEqual(search_voters('qq'), [])
+
+        response = self.client.get(reverse('voter_search'), {'q': 'whitaker'})
+        self.assertContains(response, 'ELEANOR WHITTAKER')
+
+    def test_search_finds_short_words(self):
+        create_sample_voters()
+        first, second, third = Voter.objects.order_by('pk')[:3]
+        Voter.objects.filter(pk=first.pk).update(last_name='LIND')
+        Voter.objects.filter(pk=second.pk).update(last_name='LI', street_name='WALNUT ST')
+        Voter.objects.filter(pk=third.pk).update(last_name='WU')
+        rebuild_voter_search()
+
+        self.assertEqual([voter.last_name for voter in search_voters('li')][:2], ['LI', 'LIND'])
+        self.assertEqual(search_voters('Wu')[0].last_name, 'WU')
+        self.assertEqual([voter.pk for voter in search_voters('li walnut')], [second.pk])
+        self.assertEqual(search_voters('li walnat')[0].pk, second.pk)
+
+    def test_mixed_search_runs_each_match_once(self):
+        create_sample_voters()
+        Voter.objects.filter(pk=Voter.objects.order_by('pk')[0].pk).update(street_name='WALNUT ST')
+        rebuild_voter_search()
+
+        with CaptureQueriesContext(connection) as queries:
+            search_voters('li walnut')
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                if 'MATCH' in query['sql']:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                    plans.append('\n'.join(row[-1] for row in cursor.fetchall()))
+
+        self.assertTrue(plans)
+        for plan in plans:
+            with self.subTest(plan=plan):
+                # The words subquery is read once into a list, not probed by rowid (INDEX ..:=M)
+                self.assertNotIn(':=', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+        self.assertIn('LIST SUBQUERY', plans[0])
+
+
+@skipIf(np is None, 'NumPy is not installed')
+class TurnoutScoringTests(TestCase):
+    """The turnout scoring job scores every active voter and records its run."""
+
+    def test_score_voters(self):
+        create_sample_voters()
+        Voter.objects.filter(pk=Voter.objects.order_by('pk')[0].pk).update(is_active=False)
+
+        run = score_voters(chunk_size=7)
+
+        self.assertEqual(run.voter_count, 49)
+        self.assertEqual(TurnoutScoreRun.objects.count(), 1)
+        scores = Voter.objects.filter(is_active=True).values_list('turnout_score', flat=True)
+        self.assertTrue(all(0 < score < 1 for score in scores))
+        self.assertIsNone(Voter.objects.get(is_active=False).turnout_score)
+
+        # Same age and tenure: voting in more elections means a higher score
+        frequent = Voter.objects.filter(is_active=True, v20state=True, v21town=True, v23town=True).first()
+        rare = Voter.objects.filter(
+            is_active=True, v20state=False, v21town=False, v23town=False,
+            date_birth=frequent.date_birth,
+        ).first()
+        self.assertGreater(frequent.turnout_score, rare.turnout_score)
+
+
+class VoterLoadingTests(TestCase):
+    """The loader and the incremental sync account for every row of the voter file."""
+
+    def write_csv(self, rows):
+        """Write rows under the voter file header to a temporary CSV and return its path."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(rows)
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def test_load_rejects_bad_rows(self):
+        rows = list(generate_voter_rows(6, seed=1))
+        rows[1] = rows[1][:5]                                   # too few columns
+        rows[2] = [*rows[2][:7], 'not a date', *rows[2][8:]]     # bad date of birth
+        rows[3] = [*rows[3][:11], 'YES', *rows[3][12:]]          # bad election flag
+        rows[4] = [*rows[4][:9], 'DEMOCRAT', *rows[4][10:]]      # party too long for its column
+        rows[5] = [*rows[5][:6], 'NEWTON', *rows[5][7:]]         # bad zip code: loaded as ''
+        rows.append(rows[0])                                    # voter_id already in the file
+
+        stats = load_voters(self.write_csv(rows))
+
+        self.assertEqual((stats.loaded, stats.rejected), (2, 5))
+        self.assertEqual([line for line, _, _ in stats.rejected_rows], [3, 4, 5, 6, 8])
+        self.assertIn('party is longer than 3', stats.rejected_rows[3][2])
+        self.assertIn('duplicate voter_id', stats.rejected_rows[-1][2])
+        self.assertEqual(Voter.objects.count(), 2)
+        self.assertEqual(Voter.objects.get(voter_id=rows[5][0]).zip_code, '')
+
+        # Inserted without the ORM: every field matches what parse_voter_row builds
+        stored = Voter.objects.get(voter_id=rows[0][0])
+        expected = parse_voter_row(rows[0])
+        for field in Voter._meta.concrete_fields:
+            if not field.primary_key:
+                self.assertEqual(getattr(stored, field.attname), getattr(expected, field.attname), field.name)
+
+    def test_load_refuses_a_populated_table(self):
+        path = self.write_csv(generate_voter_rows(3))
+        load_voters(path)
+        with self.assertRaises(VoterTableNotEmpty):
+            load_voters(path)
+        self.assertEqual(load_voters(path, clear=True).loaded, 3)
+        self.assertEqual(Voter.objects.count(), 3)
+
+    def test_command_reports_unreadable_files(self):
+        path = self.write_csv(generate_voter_rows(3))
+        call_command('load_voters', path, stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, '(use --clear or --sync)'):
+            call_command('load_voters', path, stdout=StringIO())
+
+        latin1 = self.write_csv([])
+        with open(latin1, 'ab') as f:
+            f.write('X1,Müller\n'.encode('latin-1'))
+        with self.assertRaisesMessage(CommandError, f'Could not read {latin1}: it is not UTF-8'):
+            call_command('load_voters', latin1, '--clear', stdout=StringIO())
+
+        huge_field = self.write_csv([['X' * 200000]])
+        with self.assertRaisesMessage(CommandError, f'Could not parse {huge_field} as CSV'):
+            call_command('load_voters', huge_field, '--clear', stdout=StringIO())
+        self.assertEqual(Voter.objects.count(), 3)
+
+    def test_sync_counts_each_kind_of_change(self):
+        rows = list(generate_voter_rows(5, seed=2))
+        load_voters(self.write_csv(rows))
+
+        changed = [*rows[1][:1], 'NEWNAME', *rows[1][2:]]
+        new = ['NEW00001X', *rows[4][1:]]
+        # rows[0] and rows[2] unchanged, rows[1] changed, rows[3] and rows[4] missing,
+        # one new voter and a duplicate of rows[0] inside the file
+        stats = sync_voters(self.write_csv([rows[0], changed, rows[2], new, rows[0]]), tombstone=True)
+
+        self.assertEqual(
+            (stats.created, stats.updated, stats.unchanged, stats.tombstoned, stats.rejected),
+            (1, 1, 2, 2, 1),
+        )
+        self.assertIn('duplicate voter_id', stats.rejected_rows[0][2])
+        self.assertEqual(Voter.objects.get(voter_id=rows[1][0]).last_name, 'NEWNAME')
+        self.assertFalse(Voter.objects.get(voter_id=rows[3][0]).is_active)
+
+        # A tombstoned voter that reappears is reactivated, even if the row is unchanged
+        stats = sync_voters(self.write_csv([rows[0], changed, rows[2], new, rows[3]]))
+        self.assertEqual((stats.created, stats.updated, stats.unchanged), (0, 1, 4))
+        self.assertTrue(Voter.objects.get(voter_id=rows[3][0]).is_active)
+        self.assertEqual(Voter.objects.count(), 6)
+
+    def test_normalize_zip_code(self):
+        self.assertEqual(normalize_zip_code('02459'), '02459')
+        self.assertEqual(normalize_zip_code('2459'), '02459')
+        self.assertEqual(normalize_zip_code('02459-1234'), '02459')
+        self.assertEqual(normalize_zip_code('024591234'), '02459')
+        self.assertEqual(normalize_zip_code(''), '')
+        self.assertEqual(normalize_zip_code('NEWTON'), '')
+
+
+class CompactColumnsMigrationTests(TransactionTestCase):
+    """Migration 0009 refuses to cut existing values that do not fit the compact columns."""
+
+    before = [('voter_analytics', '0008_turnout_score')]
+    compact = [('voter_analytics', '0009_compact_voter_columns')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_over_long_values_fail_the_migration(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        OldVoter = executor.loader.project_state(self.before).apps.get_model('voter_analytics', 'Voter')
+        voter = OldVoter.objects.create(
+            voter_id='OLD0001', last_name='A', first_name='B', street_num='1', street_name='S',
+            apt_num='', zip_code='NEWTON', date_birth='1970-01-01', date_registration='2000-01-01',
+            party='DEMOCRAT', precinct_num='1', voter_score=0, row_hash='x' * 40,
+            **{name: False for name in ELECTION_FIELDS},
+        )
+
+        executor = MigrationExecutor(connection)
+        with self.assertRaisesMessage(ValueError, "OLD0001 (party='DEMOCRAT')"):
+            executor.migrate(self.compact)
+        self.assertEqual(OldVoter.objects.get(pk=voter.pk).party, 'DEMOCRAT')
+
+        OldVoter.objects.filter(pk=voter.pk).update(party='D')
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.compact)
+        voter = OldVoter.objects.get(pk=voter.pk)
+        self.assertEqual((voter.zip_code, voter.row_hash), ('', 'x' * 16))
+
+
+class VoterBenchmarkTests(TestCase):
+    """The synthetic roll matches the loader's CSV format and views can be measured."""
+
+    def test_generated_rows_load_and_views_measure(self):
+        rows = list(generate_voter_rows(200, seed=3))
+        self.assertEqual(rows, list(generate_voter_rows(200, seed=3)))
+        Voter.objects.bulk_create([parse_voter_row(row) for row in rows])
+
+        result = measure(VoterListView, {'party': 'D'}, repeat=1)
+        self.assertEqual(set(result), {'cold_ms', 'warm_ms', 'cold_queries', 'warm_queries', 'peak_kb'})
+        self.assertGreater(result['cold_queries'], 0)
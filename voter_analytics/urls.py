@@ -10,9 +10,30 @@ urlpatterns = [
     # Main voter list page with filtering options
     path(r'', VoterListView.as_view(), name='voters'),
     
+    # Filtered voter list as a streamed CSV download
+    path(r'export.csv', VoterExportView.as_view(), name='voter_export'),
+
+    # Name and address search
+    path(r'search', VoterSearchView.as_view(), name='voter_search'),
+
     # Individual voter detail page
     path(r'voter/<int:pk>', VoterDetailView.as_view(), name='show_voter'),
     
     # Data visualization graphs page
     path(r'graphs', VoterListGraphsView.as_view(), name='graphs'),
+
+    # Precinct and street summaries
+    path(r'rollups', VoterRollupListView.as_view(), name='voter_rollups'),
+
+    # plotly.js bundle for the graphs page (served once, cached by browsers)
+    path(r'js/plotly.min.js', PlotlyJSView.as_view(), name='plotly_js'),
+
+    # Chart series for the graphs page as JSON
+    path(r'api/chart_data', VoterChartDataView.as_view(), name='voter_chart_data'),
+
+    # Precinct and street summaries as JSON
+    path(r'api/rollups', VoterRollupDataView.as_view(), name='voter_rollup_data'),
+
+    # Filter form choices as JSON
+    path(r'api/filter_options', FilterOptionsView.as_view(), name='voter_filter_options'),
 ]
\ No newline at end of file
@@ -4,95 +4,130 @@
 # list views with filtering capabilities, detail views for individual
 # voters, and data visualizations using Plotly charts.
 
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.views import View
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag
 from django.views.generic import ListView, DetailView
-from .models import Voter
+from .models import Voter, VoterRollup
+from .aggregates import get_voter_count
+from .charts import get_chart_data, get_plotlyjs
+from .export import stream_voters_csv
+from .filters import VoterFilter
+from .metadata import get_filter_options
+from .pagination import keyset_paginate, parse_cursor
+from .rollups import ROLLUP_FIELDS, ROLLUP_VALUES
+from .search import search_voters
+
+import plotly
+
+class VoterFilterMixin:
+    """Filtering shared by the voter list and graph views.
+
+    Parses the filter form's GET parameters once per request into a
+    VoterFilter, builds the queryset from it and adds the form's choices
+    and current selections to the template context."""
+
+    @cached_property
+    def voter_filter(self):
+        """Return the VoterFilter for this request's GET parameters."""
+        return VoterFilter(self.request.GET)
+
+    def get_queryset(self):
+        """Return the active voters matching the filter form, ordered by pk."""
+        return self.voter_filter.voters()
+
+    def get_context_data(self, **kwargs):
+        """Add the filter choices and the current filter values to the context."""
+        context = super().get_context_data(**kwargs)
+
+        # Filter choices, cached once per data load
+        context.update(get_filter_options(self.voter_filter.data_version))
+
+        # Pass current filter values back to template
+        context.update(self.voter_filter.selected_context())
+
+        # Current filters, for building pagination and data links
+        context['filter_querystring'] = self.voter_filter.querystring()
+        return context
 
-import plotly 
-import plotly.graph_objs as go
 
-class VoterListView(ListView):
+class VoterListView(VoterFilterMixin, ListView):
     """Display a paginated list of voters with filtering options.
-    Results are paginated at 100 voters per page."""
+    Results are paginated at 100 voters per page.
+
+    Pages are addressed with keyset cursors (?after=<pk> / ?before=<pk>)
+    so deep pages cost the same as the first one. Old ?page=N links still
+    work through Django's offset paginator."""
 
     model = Voter
     template_name = 'voter_analytics/voter_list.html'
     context_object_name = 'voters'
     paginate_by = 100  # Show 100 voters per page
 
-    def get_queryset(self):
-        """Return filtered queryset of voters based on GET parameters."""
-
-        queryset = Voter.objects.all()
-        
-        # Get filter parameters from GET request
-        party = self.request.GET.get('party')
-        voter_score = self.request.GET.get('voter_score')
-        min_birth_year = self.request.GET.get('min_birth_year')
-        max_birth_year = self.request.GET.get('max_birth_year')
-
-        v20state = self.request.GET.get('v20state')
-        v21town = self.request.GET.get('v21town')
-        v21primary = self.request.GET.get('v21primary')
-        v22general = self.request.GET.get('v22general')
-        v23town = self.request.GET.get('v23town')
-
-        
-        # Apply filters if provided
-        if party:
-            queryset = queryset.filter(party__icontains=party)
-
-        if voter_score:
-            queryset = queryset.filter(voter_score=voter_score)
-        
-        if min_birth_year:
-            queryset = queryset.filter(date_birth__year__gte=min_birth_year)
-
-        if max_birth_year:
-            queryset = queryset.filter(date_birth__year__lte=max_birth_year)
-        
-        if v20state:
-            queryset = queryset.filter(v20state=(v20state == 'true'))
-        
-        if v21town:
-            queryset = queryset.filter(v21town=(v21town == 'true'))
-        
-        if v21primary:
-            queryset = queryset.filter(v21primary=(v21primary == 'true'))
-        
-        if v22general:
-            queryset = queryset.filter(v22general=(v22general == 'true'))
-        
-        if v23town:
-            queryset = queryset.filter(v23town=(v23town == 'true'))
-        
-        return queryset
-    
+    def paginate_queryset(self, queryset, page_size):
+        """Paginate with keyset cursors unless an offset ?page= was requested."""
+
+        if 'page' in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+
+        page = keyset_paginate(
+            queryset, page_size,
+            after=parse_cursor(self.request.GET.get('after')),
+            before=parse_cursor(self.request.GET.get('before')),
+        )
+        return (None, page, page.object_list, page.has_other_pages())
+
     def get_context_data(self, **kwargs):
-        """Add filter options and voter count to template context. 
-        Preserves currently selected filter values for form persistence."""
+        """Add the voter count and pagination query string to the context.
+        Filter options and selections are added by VoterFilterMixin."""
 
         context = super().get_context_data(**kwargs)
-        context['voter_count'] = self.get_queryset().count()
-        
-        # Get distinct values for filter options
-        context['parties'] = Voter.objects.values_list('party', flat=True).distinct().order_by('party')
-        context['voter_scores'] = Voter.objects.values_list('voter_score', flat=True).distinct().order_by('voter_score')
-        
-        # Generate year range for birth years
-        context['birth_years'] = range(1920, 2005)
-        
-        # Pass current filter values back to template
-        context['selected_party'] = self.request.GET.get('party', '')
-        context['selected_voter_score'] = self.request.GET.get('voter_score', '')
-        context['selected_min_birth_year'] = self.request.GET.get('min_birth_year', '')
-        context['selected_max_birth_year'] = self.request.GET.get('max_birth_year', '')
-        context['selected_v20state'] = self.request.GET.get('v20state', '')
-        context['selected_v21town'] = self.request.GET.get('v21town', '')
-        context['selected_v21primary'] = self.request.GET.get('v21primary', '')
-        context['selected_v22general'] = self.request.GET.get('v22general', '')
-        context['selected_v23town'] = self.request.GET.get('v23town', '')
-        
+
+        # Cached per filter, so paging does not recount the matching voters
+        context['voter_count'] = get_voter_count(self.voter_filter)
+
+        return context
+
+
+class VoterExportView(View):
+    """Download the voters matching the list view's filters as a CSV file.
+
+    The response is streamed: rows are fetched in chunks and written as
+    they are read, so exporting the whole city uses as little memory as
+    exporting one page."""
+
+    def get(self, request):
+        voters = VoterFilter(request.GET).voters()
+        response = StreamingHttpResponse(stream_voters_csv(voters), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="voters.csv"'
+        return response
+
+
+class VoterSearchView(ListView):
+    """Search voters by name or address (?q=).
+
+    Up to 50 voters are shown, best match first. The search tolerates
+    typos and is answered from the voter search index, not by scanning
+    the Voter table."""
+
+    template_name = 'voter_analytics/voter_search.html'
+    context_object_name = 'voters'
+
+    def get_queryset(self):
+        """Return the voters matching the search, or nothing without one."""
+        query = self.request.GET.get('q', '').strip()
+        return search_voters(query) if query else []
+
+    def get_context_data(self, **kwargs):
+        """Add the search text to the context."""
+        context = super().get_context_data(**kwargs)
+        context['q'] = self.request.GET.get('q', '').strip()
         return context
 
 
@@ -106,213 +141,131 @@ class VoterDetailView(DetailView):
     template_name = 'voter_analytics/show_voter.html'
     context_object_name = 'voter'
 
+    def get_context_data(self, **kwargs):
+        """Add the precomputed summaries of the voter's precinct and street."""
+        context = super().get_context_data(**kwargs)
+        voter = self.object
+
+        rollups = VoterRollup.objects.filter(
+            Q(level=VoterRollup.PRECINCT, name=voter.precinct_num)
+            | Q(level=VoterRollup.STREET, name=voter.street_name)
+        )
+        for rollup in rollups:
+            context[f'{rollup.level}_rollup'] = rollup
+        return context
+
+
+def get_rollup_level(request):
+    """Return the rollup level requested with ?level=, defaulting to precincts."""
+    level = request.GET.get('level')
+    return level if level in ROLLUP_FIELDS else VoterRollup.PRECINCT
 
-class VoterListGraphsView(ListView):
-    """Display data visualizations (charts and graphs) for voter analytics."""
+
+class VoterRollupListView(ListView):
+    """Display the precinct or street summaries (?level=precinct|street).
+
+    Each row shows registrations, party mix, turnout per election and
+    average voter score, read from the precomputed VoterRollup table."""
+
+    model = VoterRollup
+    template_name = 'voter_analytics/rollups.html'
+    context_object_name = 'rollups'
+    paginate_by = 100
+
+    def get_queryset(self):
+        """Return the rollups of the requested level, ordered by name."""
+        return VoterRollup.objects.filter(level=get_rollup_level(self.request)).order_by('name')
+
+    def get_context_data(self, **kwargs):
+        """Add the current level and the available levels to the context."""
+        context = super().get_context_data(**kwargs)
+        context['level'] = get_rollup_level(self.request)
+        context['levels'] = VoterRollup.LEVEL_CHOICES
+        return context
+
+
+class VoterRollupDataView(View):
+    """Return the precinct or street summaries as JSON.
+
+    ?level= selects precincts (default) or streets; ?name= narrows the
+    result to one precinct or street."""
+
+    def get(self, request):
+        level = get_rollup_level(request)
+        rollups = VoterRollup.objects.filter(level=level).order_by('name')
+        if request.GET.get('name'):
+            rollups = rollups.filter(name=request.GET['name'])
+        return JsonResponse({'level': level, 'rollups': list(rollups.values(*ROLLUP_VALUES))})
+
+
+class VoterListGraphsView(VoterFilterMixin, ListView):
+    """Display data visualizations (charts and graphs) for voter analytics.
+    The charts are rendered in the browser from VoterChartDataView's JSON."""
 
     model = Voter
     template_name = 'voter_analytics/graphs.html'
     context_object_name = 'voters'
 
-
-    def get_queryset(self):
-        """Return filtered queryset of voters based on GET parameters.
-        
-        Applies the same filtering logic as VoterListView to ensure
-        visualizations reflect the filtered dataset."""
-
-        queryset = Voter.objects.all()
-        
-        # Get filter parameters from GET request
-        party = self.request.GET.get('party')
-        voter_score = self.request.GET.get('voter_score')
-        min_birth_year = self.request.GET.get('min_birth_year')
-        max_birth_year = self.request.GET.get('max_birth_year')
-
-        v20state = self.request.GET.get('v20state')
-        v21town = self.request.GET.get('v21town')
-        v21primary = self.request.GET.get('v21primary')
-        v22general = self.request.GET.get('v22general')
-        v23town = self.request.GET.get('v23town')
-
-        
-        # Apply filters if provided
-        if party:
-            queryset = queryset.filter(party__icontains=party)
-
-        if voter_score:
-            queryset = queryset.filter(voter_score=voter_score)
-        
-        if min_birth_year:
-            queryset = queryset.filter(date_birth__year__gte=min_birth_year)
-
-        if max_birth_year:
-            queryset = queryset.filter(date_birth__year__lte=max_birth_year)
-        
-        if v20state:
-            queryset = queryset.filter(v20state=(v20state == 'true'))
-        
-        if v21town:
-            queryset = queryset.filter(v21town=(v21town == 'true'))
-        
-        if v21primary:
-            queryset = queryset.filter(v21primary=(v21primary == 'true'))
-        
-        if v22general:
-            queryset = queryset.filter(v22general=(v22general == 'true'))
-        
-        if v23town:
-            queryset = queryset.filter(v23town=(v23town == 'true'))
-        
-        return queryset
-    
     def get_context_data(self, **kwargs):
-        """Generate Plotly visualizations and add to template context.
-        
-        Creates three interactive charts: pie chart for party distribution,
-        bar chart for birth year distribution, and histogram for election
-        participation. All charts reflect the currently applied filters.
+        """Add what the page needs to draw its Plotly charts client-side.
+
+        The page shows three interactive charts: pie chart for party
+        distribution, bar chart for birth year distribution, and histogram
+        for election participation, all reflecting the current filters.
+        Their data is fetched by the browser from VoterChartDataView, so no
+        figures are built on the server.
         """
         context = super().get_context_data(**kwargs)
-        context['voter_count'] = self.get_queryset().count()
-        
-        # Get distinct values for filter options
-        context['parties'] = Voter.objects.values_list('party', flat=True).distinct().order_by('party')
-        context['voter_scores'] = Voter.objects.values_list('voter_score', flat=True).distinct().order_by('voter_score')
-        
-        # Generate year range for birth years
-        context['birth_years'] = range(1919, 2005)
-        
-        # Pass current filter values back to template
-        context['selected_party'] = self.request.GET.get('party', '')
-        context['selected_voter_score'] = self.request.GET.get('voter_score', '')
-        context['selected_min_birth_year'] = self.request.GET.get('min_birth_year', '')
-        context['selected_max_birth_year'] = self.request.GET.get('max_birth_year', '')
-        context['selected_v20state'] = self.request.GET.get('v20state', '')
-        context['selected_v21town'] = self.request.GET.get('v21town', '')
-        context['selected_v21primary'] = self.request.GET.get('v21primary', '')
-        context['selected_v22general'] = self.request.GET.get('v22general', '')
-        context['selected_v23town'] = self.request.GET.get('v23town', '')
-
-
-        filtered_voters = self.get_queryset()
-
-        parties_filtered_count_dicc = {}
-        
-        year_filtered_count_dicc = {}
-
-        vote_filtered_count_dicc = {
-            'v20state': {'voted': 0, 'not_voted': 0},
-            'v21town': {'voted': 0, 'not_voted': 0},
-            'v21primary': {'voted': 0, 'not_voted': 0},
-            'v22general': {'voted': 0, 'not_voted': 0},
-            'v23town': {'voted': 0, 'not_voted': 0}
-        }
-        
-        # Parties chart diccionary
-        for voter in filtered_voters:
-            if voter.party in parties_filtered_count_dicc:
-                parties_filtered_count_dicc[voter.party] += 1
-            else:
-                parties_filtered_count_dicc[voter.party] = 1
-
-        # Year distribution chart diccionary      
-        for voter in filtered_voters:
-            if voter.date_birth.year in year_filtered_count_dicc:
-                year_filtered_count_dicc[voter.date_birth.year] += 1
-            else:
-                year_filtered_count_dicc[voter.date_birth.year] = 1
-        
-        # Participation in election chart diccionary  
-        for voter in filtered_voters:
-            if 'v20state' not in vote_filtered_count_dicc:
-                vote_filtered_count_dicc['v20state'] = {'voted': 0, 'not_voted': 0}
-            if voter.v20state:
-                vote_filtered_count_dicc['v20state']['voted'] += 1
-            else:
-                vote_filtered_count_dicc['v20state']['not_voted'] += 1
-            
-            if 'v21town' not in vote_filtered_count_dicc:
-                vote_filtered_count_dicc['v21town'] = {'voted': 0, 'not_voted': 0}
-            if voter.v21town:
-                vote_filtered_count_dicc['v21town']['voted'] += 1
-            else:
-                vote_filtered_count_dicc['v21town']['not_voted'] += 1
-            
-            if 'v21primary' not in vote_filtered_count_dicc:
-                vote_filtered_count_dicc['v21primary'] = {'voted': 0, 'not_voted': 0}
-            if voter.v21primary:
-                vote_filtered_count_dicc['v21primary']['voted'] += 1
-            else:
-                vote_filtered_count_dicc['v21primary']['not_voted'] += 1
-            
-            if 'v22general' not in vote_filtered_count_dicc:
-                vote_filtered_count_dicc['v22general'] = {'voted': 0, 'not_voted': 0}
-            if voter.v22general:
-                vote_filtered_count_dicc['v22general']['voted'] += 1
-            else:
-                vote_filtered_count_dicc['v22general']['not_voted'] += 1
-            
-            if 'v23town' not in vote_filtered_count_dicc:
-                vote_filtered_count_dicc['v23town'] = {'voted': 0, 'not_voted': 0}
-            if voter.v23town:
-                vote_filtered_count_dicc['v23town']['voted'] += 1
-            else:
-                vote_filtered_count_dicc['v23town']['not_voted'] += 1
-
-        # Bar Chart B(irth Year Distribution)
-        x = []
-        y = []
-
-        for key in year_filtered_count_dicc.keys():
-            x.append(key)
-        
-        for value in year_filtered_count_dicc.values():
-            y.append(value)
-
-        fig = go.Bar(x=x, y=y)
-        title_text = "Voter Distribution by Birth Year"
-        graph_bar_div_splits = plotly.offline.plot({"data": [fig],
-                                                    "layout_title_text": title_text},
-                                                    auto_open=False,
-                                                    output_type='div')
-        
-        context['graph_distribution_div_splits'] = graph_bar_div_splits
-
-        # Pie Graph (Affiliated Party)
-   
-        x = []
-        y = []
-
-        for key in parties_filtered_count_dicc.keys():
-            x.append(key)
-        
-        for value in parties_filtered_count_dicc.values():
-            y.append(value)
-
-        fig = go.Pie(labels=x, values=y)
-
-        title_text = "Voter Party Distribution"
-        graph_pie_div_splits = plotly.offline.plot({"data": [fig], 
-                                                "layout_title_text": title_text},
-                                                auto_open=False,
-                                                output_type='div')
-        context['graph_pie_div_splits'] = graph_pie_div_splits
-
-        # Histogram (Election Participation)
-        elections = ['v20state', 'v21town', 'v21primary', 'v22general', 'v23town']
-        election_keys = ['v20state', 'v21town', 'v21primary', 'v22general', 'v23town']
-        
-        voted_counts = [vote_filtered_count_dicc[key]['voted'] for key in election_keys]
-        
-        fig = go.Bar(x=elections, y=voted_counts)
-        title_text = "Voter Participation by Election"
-        graph_histogram_div = plotly.offline.plot({"data": [fig],
-                                                   "layout_title_text": title_text},
-                                                   auto_open=False,
-                                                   output_type='div')
-        
-        context['graph_histogram_div_splits'] = graph_histogram_div
-
+        context['plotly_version'] = plotly.__version__
         return context
-    
+
+
+class PlotlyJSView(View):
+    """Serve the plotly.js bundle for the graphs page.
+
+    The chart divs do not inline plotly.js; the page loads it from here
+    instead, with a versioned URL and a long cache lifetime so browsers
+    download it once."""
+
+    def get(self, request):
+        response = HttpResponse(get_plotlyjs(), content_type='application/javascript')
+        patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 365)
+        return response
+
+
+class FilterOptionsView(View):
+    """Return the voter filter form choices (parties, voter scores and
+    birth years) as JSON, from the same cache the HTML views use."""
+
+    def get(self, request):
+        return JsonResponse(get_filter_options())
+
+
+def request_voter_filter(request):
+    """Return the VoterFilter of a request, built once and shared by the ETag and the view."""
+    if not hasattr(request, '_voter_filter'):
+        request._voter_filter = VoterFilter(request.GET)
+    return request._voter_filter
+
+
+def chart_data_etag(request):
+    """Return an ETag for the chart data of a request: its filter and data version.
+
+    The version is read from the database, so a reload from any process
+    changes the ETag and revalidations get the new charts.
+    """
+    return request_voter_filter(request).cache_key('chart_data')
+
+
+@method_decorator(cache_control(public=True, max_age=5 * 60), name='get')
+@method_decorator(etag(chart_data_etag), name='get')
+class VoterChartDataView(View):
+    """Return the chart series for the current voter filter as JSON.
+
+    Party counts, the birth year histogram and election participation,
+    as compact label/value lists. Responses carry an ETag tied to the
+    filter and the voter data version, so browsers and HTTP caches can
+    revalidate them without the charts being recomputed."""
+
+    def get(self, request):
+        return JsonResponse(get_chart_data(request_voter_filter(request)))